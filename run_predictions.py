@@ -1,4 +1,5 @@
-import argparse, pandas as pd
+import argparse, os, traceback, numpy as np, pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from src.loaders.mlb import load_mlb_results
@@ -6,98 +7,235 @@ from src.loaders.nba import load_nba_results
 from src.loaders.nfl import load_nfl_results
 from src.loaders.cfb import load_cfb_results
 
-from src.features.elo import add_elo
-from src.features.rolling import add_rolling_form
-from src.sentiment.trends import trends_by_team
-from src.sentiment.gdelt import gdelt_team_tone
+from src.features.elo import add_elo, final_ratings
+from src.features.team_games import add_team_rolling, extend_team_rolling, FORM_STATS, TOTALS_STATS
+from src.features.store import FeatureStore, file_digest
+from src.features.compact import compact_teams, compact_features, frame_mb, team_lookup
+from src.sentiment.trends import trends_by_team, TrendsCache, ANCHORS, ANCHOR
+from src.sentiment.gdelt import gdelt_team_tone, DEFAULT_DAILY as GDELT_DAILY
 from src.models.backtest import walk_forward
 from src.models.totals import totals_walk_forward
-from src.render_html import render_html, spread_from_prob
-from src.edge.american import prob_to_american, american_str
+from src.models.artifacts import daily_scores
+from src.models.parallel import set_thread_budget
+from src.render_html import render_html, prediction_rows
+from src.edge.odds import OddsStore, market_edges, best_edges, consensus_total
 from src.injuries.features import add_injury_features
 from src.weather.meteostat_features import add_weather_features
+from src.weather.cache import WeatherCache
+from src import profiling
+from src.profiling import stage
 
-def enrich(df: pd.DataFrame, league: str, venues_csv: str | None = None, injuries_csv: str | None = None) -> pd.DataFrame:
-    df = add_elo(df)
-    df = add_rolling_form(df)
-    teams = sorted(set(df["home"]) | set(df["away"]))
-    trend = trends_by_team(teams, days=14)
-    tone = gdelt_team_tone(teams, days=14)
-    df = df.merge(trend.rename(columns={"team":"home","trends_mean":"trends_home"}), on="home", how="left")
-    df = df.merge(trend.rename(columns={"team":"away","trends_mean":"trends_away"}), on="away", how="left")
-    df = df.merge(tone.rename(columns={"team":"home","tone_mean":"tone_home"}), on="home", how="left")
-    df = df.merge(tone.rename(columns={"team":"away","tone_mean":"tone_away"}), on="away", how="left")
-    df[["trends_home","trends_away","tone_home","tone_away"]] = df[["trends_home","trends_away","tone_home","tone_away"]].fillna(0.0)
+TEAM_STATS = {**FORM_STATS, **TOTALS_STATS}
+
+def _team_features(df: pd.DataFrame, history: pd.DataFrame | None = None, league: str | None = None) -> pd.DataFrame:
+    """Elo and rolling form/points; with `history` (an enriched frame these games follow)
+    Elo resumes from its final ratings and rolling windows read only its recent games."""
+    with stage("enrich.elo", league, rows=len(df)):
+        df = add_elo(df) if history is None else add_elo(df, init=final_ratings(history))
+    with stage("enrich.rolling", league, rows=len(df)):
+        if history is None:
+            # Rolling form and totals inputs come from one pass over the team-game table.
+            return add_team_rolling(df, TEAM_STATS)
+        return extend_team_rolling(history, df, TEAM_STATS)
+
+def _row_features(df: pd.DataFrame, league: str, venues_csv: str | None = None, injuries_csv: str | None = None, weather_cache=None) -> pd.DataFrame:
+    with stage("enrich.sentiment", league, rows=len(df)):
+        teams = sorted(set(df["home"]) | set(df["away"]))
+        trend = trends_by_team(teams, days=14, cache=TrendsCache(), anchor=ANCHORS.get(league, ANCHOR)).set_index("team")["trends_mean"]
+        tone = gdelt_team_tone(teams, days=14, daily=GDELT_DAILY).set_index("team")["tone_mean"]
+        # Per-team values are looked up by key rather than merged, so no intermediate frames.
+        df = df.copy(deep=False)
+        for name, values in (("trends", trend), ("tone", tone)):
+            for side in ("home", "away"):
+                df[f"{name}_{side}"] = np.nan_to_num(team_lookup(df[side], values), nan=0.0)
     # Injuries (CSV) and Weather (venues CSV)
-    if injuries_csv:
-        df = add_injury_features(df, league, injuries_csv)
-    else:
-        df = add_injury_features(df, league, None)
-    if venues_csv:
-        df = add_weather_features(df, league, venues_csv)
+    with stage("enrich.injuries", league, rows=len(df)):
+        if injuries_csv:
+            df = add_injury_features(df, league, injuries_csv)
+        else:
+            df = add_injury_features(df, league, None)
+    with stage("enrich.weather", league, rows=len(df)):
+        if venues_csv:
+            df = add_weather_features(df, league, venues_csv, cache=weather_cache)
+        else:
+            df["temp_c"] = float("nan"); df["wind_kmh"] = float("nan"); df["prcp_mm"] = float("nan"); df["is_dome"] = 0
+    return df
+
+def enrich(df: pd.DataFrame, league: str, venues_csv: str | None = None, injuries_csv: str | None = None, weather_cache=None,
+           store: FeatureStore | None = None, lean: bool = False) -> pd.DataFrame:
+    """Add model features. With a FeatureStore, an unchanged history is served from disk
+    and appended games are enriched on their own; stored rows keep the sentiment values
+    of the run that built them. `lean` keeps teams as categoricals and downcasts only
+    columns that convert exactly (see compact_features)."""
+    if lean:
+        df = compact_teams(df)
+    if store is None:
+        out = _row_features(_team_features(df, league=league), league, venues_csv, injuries_csv, weather_cache)
+        return _compact(out, league) if lean else out
+    params = {"league": league, "injuries": file_digest(injuries_csv), "venues": file_digest(venues_csv),
+              "gdelt": file_digest(GDELT_DAILY)}
+    if lean:
+        params["lean"] = True
+    with stage("enrich.store_lookup", league):
+        stored, n = store.lookup(league, df, params)
+    if stored is not None and n == len(df):
+        print(f"[{league}] features: {n} rows from store")
+        return stored
+    if stored is not None and n > 0:
+        print(f"[{league}] features: {n} rows from store, {len(df) - n} new")
+        new = df.iloc[n:].reset_index(drop=True)
+        new = _row_features(_team_features(new, history=stored, league=league), league, venues_csv, injuries_csv, weather_cache)
+        out = pd.concat([stored, new], ignore_index=True)
     else:
-        df["temp_c"] = None; df["wind_kmh"] = None; df["prcp_mm"] = None; df["is_dome"] = 0
+        out = _row_features(_team_features(df, league=league), league, venues_csv, injuries_csv, weather_cache)
+    if lean:
+        out = _compact(out, league)
+    with stage("enrich.store_save", league, rows=len(out)):
+        store.save(league, df, params, out)
+    return out
+
+def _compact(df: pd.DataFrame, league: str) -> pd.DataFrame:
+    with stage("enrich.compact", league, rows=len(df)):
+        before = frame_mb(df)
+        df = compact_features(compact_teams(df))
+        print(f"[{league}] lean frame: {before:.1f} MB -> {frame_mb(df):.1f} MB")
     return df
 
-def main(start: int, end: int, out_path: str, venues_csv: str | None, injuries_csv: str | None):
-    leagues = {
-        "NFL": load_nfl_results,
-        "NBA": load_nba_results,
-        "MLB": load_mlb_results,
-        "CFB": load_cfb_results,
-    }
-    pred_rows = []
-    for league, loader in leagues.items():
-        print(f"[{league}] loading...")
-        df = loader(start, end)
-        df = enrich(df, league, venues_csv=venues_csv, injuries_csv=injuries_csv)
+LEAGUES = {
+    "NFL": load_nfl_results,
+    "NBA": load_nba_results,
+    "MLB": load_mlb_results,
+    "CFB": load_cfb_results,
+}
+
+def run_league(league: str, start: int, end: int, venues_csv: str | None, injuries_csv: str | None,
+               incremental: bool = False, wf_jobs: int = 1, weather_cache=None, feature_store: str | None = None,
+               models_dir: str | None = None, lean: bool = False, odds_dir: str | None = None, retrain_every_days: int = 7):
+    """Load, enrich and walk-forward one league; returns its report rows as a DataFrame.
+    Models are retrained every `retrain_every_days`, in the walk-forward and for saved models.
+    With `models_dir` the walk-forward is skipped and saved models score the recent slate instead.
+    With `odds_dir` (an OddsStore root) closing totals drive the O/U lean and +EV lines are printed."""
+    print(f"[{league}] loading...")
+    with stage("load", league) as rec:
+        df = LEAGUES[league](start, end)
+        rec["rows"] = len(df)
+    store = FeatureStore(feature_store) if feature_store else None
+    with stage("enrich", league, rows=len(df)):
+        df = enrich(df, league, venues_csv=venues_csv, injuries_csv=injuries_csv, weather_cache=weather_cache, store=store, lean=lean)
+    if models_dir:
+        print(f"[{league}] scoring with saved models...")
+        with stage("score", league, rows=len(df)):
+            wf_now = daily_scores(df, league, models_dir, horizon_days=14, retrain_every_n_days=retrain_every_days)
+    else:
         print(f"[{league}] walk-forward predicting...")
-        wf = walk_forward(df, initial_days=365*2, retrain_every_n_days=7)
-        tf = totals_walk_forward(df, initial_days=365*2, retrain_every_n_days=7)
-        if wf.empty: continue
+        with stage("walk_forward", league, rows=len(df)):
+            wf = walk_forward(df, initial_days=365*2, retrain_every_n_days=retrain_every_days, incremental=incremental, n_jobs=wf_jobs,
+                              return_report=incremental)
+        if incremental:
+            wf, report = wf
+            _print_wf_report(report, league)
+        with stage("totals_walk_forward", league, rows=len(df)):
+            tf = totals_walk_forward(df, initial_days=365*2, retrain_every_n_days=retrain_every_days, n_jobs=wf_jobs)
+        if wf.empty: return prediction_rows(wf, league)
         horizon_start = wf["date"].max() - pd.Timedelta(days=14)
         wf_now = wf[wf["date"] >= horizon_start]
         tf_now = tf[tf["date"] >= horizon_start] if not tf.empty else pd.DataFrame(columns=["date","home","away","pred_total"])
         wf_now = wf_now.merge(tf_now, on=["date","home","away"], how="left")
+    if odds_dir and not wf_now.empty:
+        with stage("edges", league, rows=len(wf_now)):
+            wf_now = _attach_market(wf_now, league, odds_dir)
+    with stage("prediction_rows", league, rows=len(wf_now)):
+        return prediction_rows(wf_now, league)
 
-        for _, r in wf_now.iterrows():
-            p_home = float(r["p_home"])
-            p_away = 1 - p_home
-            am_home = prob_to_american(p_home); am_away = prob_to_american(p_away)
-            raw_spread = spread_from_prob(p_home, league)
-            line_spread = round(raw_spread * 2) / 2.0 if league != "MLB" else (-1.5 if p_home >= 0.5 else +1.5)
-            pred_total = float(r["pred_total"]) if pd.notna(r.get("pred_total", float("nan"))) else None
+def _print_wf_report(report: pd.DataFrame, league: str):
+    """Refit counts and, for each full refit after warm starts, how far the warm model had drifted."""
+    if report.empty:
+        return
+    counts = report["refit"].value_counts()
+    print(f"[{league}] walk-forward: {counts.get('full', 0)} full refits, {counts.get('incremental', 0)} incremental")
+    drift = report.dropna(subset=["drift_mean_abs"]) if "drift_mean_abs" in report else report.iloc[:0]
+    if not drift.empty:
+        cols = ["cutoff", "n_train", "drift_mean_abs", "drift_logloss", "drift_brier"]
+        print(drift[cols].to_string(index=False, float_format=lambda x: f"{x:.4f}"))
 
-            ml_lean = "HOME" if p_home >= 0.5 else "AWAY"
-            if league == "MLB":
-                spread_lean = f"{'HOME' if p_home >= 0.5 else 'AWAY'} {'-1.5' if p_home >= 0.5 else '+1.5'}"
-            else:
-                side = "HOME" if line_spread >= 0 else "AWAY"
-                spread_lean = f"{side} {abs(line_spread):.1f}"
-            ou_lean = "NO EDGE"
-            if pred_total is not None:
-                # Simple O/U lean placeholder (needs market line to compare). Keep as NO EDGE unless you have lines.
-                ou_lean = "MODEL TOTAL"
+def _attach_market(wf_now: pd.DataFrame, league: str, odds_dir: str) -> pd.DataFrame:
+    """Add the consensus closing total as total_line and report the best +EV line per game/market."""
+    lines = OddsStore(odds_dir).load(league, wf_now["date"].min(), wf_now["date"].max())
+    if lines.empty:
+        return wf_now
+    best = best_edges(market_edges(wf_now, lines, league))
+    plus = best[best["pick_ev"] > 0]
+    print(f"[{league}] odds: {len(lines)} snapshots, {len(plus)} of {len(best)} game/markets +EV at the best book")
+    keys = wf_now[["date", "home", "away"]].astype({"home": str, "away": str})
+    keys["date"] = pd.to_datetime(keys["date"]).dt.normalize()
+    return wf_now.assign(total_line=keys.merge(consensus_total(lines), on=["date", "home", "away"], how="left")["total_line"].to_numpy())
 
-            pred_rows.append({
-                "Date": pd.to_datetime(r["date"]).strftime("%Y-%m-%d"),
-                "League": league,
-                "Matchup": f"{r['away']} @ {r['home']}",
-                "Home Win Prob": f"{p_home:.1%}",
-                "Away Win Prob": f"{p_away:.1%}",
-                "Home Price (American)": american_str(am_home),
-                "Away Price (American)": american_str(am_away),
-                "Pred. Spread (Home−Away)": f"{raw_spread:+.1f}",
-                "Model Spread Line": f"{line_spread:+.1f}" if league != "MLB" else ("-1.5" if p_home >= 0.5 else "+1.5"),
-                "Pred. Total": f"{pred_total:.1f}" if pred_total is not None else "",
-                "Model Lean – ML": ml_lean,
-                "Model Lean – Spread": spread_lean,
-                "Model Lean – O/U": ou_lean,
-            })
+def _run_league_safe(league, start, end, venues_csv, injuries_csv, weather_cache=None, profile=None, threads=None, **kwargs):
+    """run_league that returns (rows, (weather hits, misses), traceback or None, profile records)
+    instead of raising. `profile` (Profiler kwargs) enables profiling inside a worker process;
+    `threads` caps the LightGBM threads of a worker that shares the CPU with other leagues."""
+    if threads is not None:
+        set_thread_budget(threads)
+    if profile is not None:
+        profiling.enable(**profile)
+    if weather_cache is None and venues_csv:
+        weather_cache = WeatherCache()
+    before = (weather_cache.hits, weather_cache.misses) if weather_cache is not None else (0, 0)
+    try:
+        rows, err = run_league(league, start, end, venues_csv, injuries_csv, weather_cache=weather_cache, **kwargs), None
+    except Exception:
+        rows, err = None, traceback.format_exc()
+    after = (weather_cache.hits, weather_cache.misses) if weather_cache is not None else (0, 0)
+    records = profiling.disable().records if profile is not None else []
+    return rows, (after[0] - before[0], after[1] - before[1]), err, records
 
+def main(start: int, end: int, out_path: str, venues_csv: str | None, injuries_csv: str | None, incremental: bool = False, wf_jobs: int = 1, jobs: int = 1,
+         feature_store: str | None = None, models_dir: str | None = None, lean: bool = False, odds_dir: str | None = None,
+         retrain_every_days: int = 7, profile: str | None = None, profile_memory: bool = False, profile_cprofile: bool = False):
+    """Run every league; jobs > 1 runs leagues in separate processes. Rows keep LEAGUES
+    order either way, and a failing league is reported without stopping the others.
+    With `profile` (a directory) stage timings are written there as profile.json/.html."""
+    args = (start, end, venues_csv, injuries_csv)
+    kw = dict(incremental=incremental, wf_jobs=wf_jobs, feature_store=feature_store, models_dir=models_dir, lean=lean, odds_dir=odds_dir,
+              retrain_every_days=retrain_every_days)
+    prof_opts = dict(memory=profile_memory, cprofile_dir=Path(profile) / "cprofile" if profile_cprofile else None) if profile else None
+    prof = profiling.enable(**prof_opts) if prof_opts else None
+    if jobs > 1:
+        workers = min(jobs, len(LEAGUES))
+        threads = max(1, (os.cpu_count() or 1) // workers)
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futs = {lg: ex.submit(_run_league_safe, lg, *args, profile=prof_opts, threads=threads, **kw) for lg in LEAGUES}
+            results = {}
+            for lg, f in futs.items():
+                try:
+                    results[lg] = f.result()
+                except Exception:
+                    # The worker died (OOM kill, crash in native code): BrokenProcessPool.
+                    results[lg] = None, (0, 0), traceback.format_exc(), []
+    else:
+        weather_cache = WeatherCache() if venues_csv else None
+        results = {lg: _run_league_safe(lg, *args, weather_cache=weather_cache, **kw) for lg in LEAGUES}
+    frames, hits, misses, failed, worker_records = [], 0, 0, [], []
+    for league, (rows, wx, err, records) in results.items():
+        if err:
+            print(f"[{league}] FAILED:\n{err}")
+            failed.append(league)
+        if rows is not None:
+            frames.append(rows)
+        hits += wx[0]; misses += wx[1]
+        worker_records += records
+    if venues_csv:
+        print(f"weather cache: {hits} hits, {misses} misses")
+    if failed:
+        print(f"Leagues failed: {', '.join(failed)}")
     out = Path(out_path)
     print(f"Writing HTML -> {out.resolve()}")
-    render_html(pred_rows, out)
+    report = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    with stage("render_html", rows=len(report)):
+        render_html(report, out)
+    if prof is not None:
+        profiling.disable()
+        print(f"Profile -> {prof.write(profile, worker_records).resolve()}")
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
@@ -106,5 +244,19 @@ if __name__ == "__main__":
     ap.add_argument("--out", type=str, default="predictions.html")
     ap.add_argument("--venues_csv", type=str, default="data/venues.csv")
     ap.add_argument("--injuries_csv", type=str, default="data/injuries.csv")
+    ap.add_argument("--incremental", action="store_true", help="warm-start retrains, full refit every 4 windows")
+    ap.add_argument("--wf_jobs", type=int, default=1, help="worker processes for walk-forward windows (-1 = all cores)")
+    ap.add_argument("--jobs", type=int, default=1, help="run leagues in this many processes")
+    ap.add_argument("--feature_store", type=str, default="data/cache/features", help="enriched-frame store dir ('' disables)")
+    ap.add_argument("--score_only", action="store_true", help="score the recent slate with saved models instead of a full walk-forward")
+    ap.add_argument("--retrain_every_days", type=int, default=7, help="days between model retrains (walk-forward windows and saved models)")
+    ap.add_argument("--models_dir", type=str, default="data/models")
+    ap.add_argument("--lean", action="store_true", help="categorical teams and exactly downcast count/flag columns to cut enrich memory")
+    ap.add_argument("--odds_dir", type=str, default="", help="odds store dir (python -m src.edge.odds) for market totals and +EV lines")
+    ap.add_argument("--profile", type=str, default=None, help="write stage timings (profile.json/.html) to this directory")
+    ap.add_argument("--profile_memory", action="store_true", help="with --profile, record tracemalloc peaks per stage")
+    ap.add_argument("--profile_cprofile", action="store_true", help="with --profile, dump cProfile stats per top-level stage")
     args = ap.parse_args()
-    main(args.start, args.end, args.out, args.venues_csv, args.injuries_csv)
+    main(args.start, args.end, args.out, args.venues_csv, args.injuries_csv, incremental=args.incremental, wf_jobs=args.wf_jobs, jobs=args.jobs,
+         feature_store=args.feature_store or None, models_dir=args.models_dir if args.score_only else None, lean=args.lean,
+         odds_dir=args.odds_dir or None, retrain_every_days=args.retrain_every_days, profile=args.profile, profile_memory=args.profile_memory, profile_cprofile=args.profile_cprofile)
@@ -0,0 +1,127 @@
+"""
+Benchmark harness over synthetic leagues.
+
+    python -m src.bench.run --sizes 1000 10000 100000 1000000 --out bench.json
+    python -m src.bench.run --sizes 10000 --compare bench.json
+
+Times add_elo, add_rolling_form, add_injury_features, the assembled model frame
+(plain and --lean dtypes), walk_forward, totals_walk_forward and render_html per
+size and records the tracemalloc peak of each stage (disable with --no-memory; tracing slows the timed stages). Walk-forward
+stages are skipped above --wf-max-games. Results go to JSON with the commit and
+library versions, so runs from different commits can be compared with --compare.
+"""
+import argparse, json, os, platform, subprocess, tempfile, time, tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+from .synthetic import synthetic_league, synthetic_injuries
+from ..features.elo import add_elo
+from ..features.rolling import add_rolling_form
+from ..features.team_games import add_team_rolling, FORM_STATS, TOTALS_STATS
+from ..features.compact import compact_teams, compact_features, frame_mb
+from ..injuries.features import add_injury_features, InjuryStore
+from ..models.backtest import walk_forward
+from ..models.totals import totals_walk_forward
+from ..render_html import render_html, prediction_rows
+
+LEAGUE = "NBA"
+
+def _measure(fn, memory: bool):
+    if memory:
+        tracemalloc.start()
+    t = time.perf_counter()
+    try:
+        out = fn()
+    finally:
+        seconds = time.perf_counter() - t
+        peak = tracemalloc.get_traced_memory()[1] if memory else None
+        if memory:
+            tracemalloc.stop()
+    return out, seconds, (peak / 2**20 if peak is not None else None)
+
+def _model_frame(games: pd.DataFrame, store: InjuryStore, lean: bool = False) -> pd.DataFrame:
+    """Features walk_forward expects, without network-backed sentiment or weather."""
+    df = add_team_rolling(add_elo(compact_teams(games) if lean else games), {**FORM_STATS, **TOTALS_STATS})
+    df = add_injury_features(df, LEAGUE, store=store)
+    for c in ("trends_home", "trends_away", "tone_home", "tone_away"):
+        df[c] = 0.0
+    df["temp_c"] = np.nan; df["wind_kmh"] = np.nan; df["prcp_mm"] = np.nan; df["is_dome"] = 0
+    return compact_features(df) if lean else df
+
+def run_size(n_games: int, memory=True, wf_max_games=20_000, initial_days=None, seed=0) -> list[dict]:
+    """Benchmark every stage on one synthetic league; initial_days defaults to 75% of its span."""
+    games = synthetic_league(n_games, seed=seed)
+    if initial_days is None:
+        initial_days = max(1, int(0.75 * (games["date"].max() - games["date"].min()).days))
+    store = InjuryStore(synthetic_injuries(games, LEAGUE, seed=seed))
+    results = []
+
+    def stage(name, fn):
+        out, seconds, peak = _measure(fn, memory)
+        results.append({"stage": name, "n_games": n_games, "seconds": round(seconds, 4),
+                        "peak_mb": round(peak, 2) if peak is not None else None,
+                        "rows": int(len(out)) if hasattr(out, "__len__") else None,
+                        "frame_mb": round(frame_mb(out), 2) if isinstance(out, pd.DataFrame) else None})
+        print(f"  {name:<22} {n_games:>9} games  {seconds:9.3f}s" + (f"  {peak:9.1f} MB" if peak is not None else ""))
+        return out
+
+    stage("add_elo", lambda: add_elo(games))
+    stage("add_rolling_form", lambda: add_rolling_form(games))
+    stage("add_injury_features", lambda: add_injury_features(games, LEAGUE, store=store))
+    stage("model_frame_lean", lambda: _model_frame(games, store, lean=True))
+    df = stage("model_frame", lambda: _model_frame(games, store))
+    if n_games <= wf_max_games:
+        wf = stage("walk_forward", lambda: walk_forward(df, initial_days=initial_days))
+        stage("totals_walk_forward", lambda: totals_walk_forward(df, initial_days=initial_days))
+    else:
+        results += [{"stage": s, "n_games": n_games, "skipped": True} for s in ("walk_forward", "totals_walk_forward")]
+        wf = df[["date","home","away"]].assign(p_home=df["elo_home_exp"])
+    with tempfile.TemporaryDirectory() as tmp:
+        stage("render_html", lambda: render_html(prediction_rows(wf, LEAGUE), Path(tmp) / "bench.html") or wf)
+    return results
+
+def _meta() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    import lightgbm, sklearn
+    return {"commit": commit, "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(), "pandas": pd.__version__, "numpy": np.__version__,
+            "lightgbm": lightgbm.__version__, "sklearn": sklearn.__version__, "cpus": os.cpu_count()}
+
+def compare(current: list[dict], baseline: list[dict]) -> None:
+    base = {(r["stage"], r["n_games"]): r for r in baseline if not r.get("skipped")}
+    for r in current:
+        b = base.get((r["stage"], r["n_games"]))
+        if r.get("skipped") or b is None:
+            continue
+        line = f"  {r['stage']:<22} {r['n_games']:>9}  time x{r['seconds'] / max(b['seconds'], 1e-9):5.2f}"
+        if r.get("peak_mb") is not None and b.get("peak_mb"):
+            line += f"  peak x{r['peak_mb'] / b['peak_mb']:5.2f}"
+        print(line)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic leagues.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    ap.add_argument("--out", type=str, default="bench.json")
+    ap.add_argument("--no-memory", action="store_true")
+    ap.add_argument("--wf-max-games", type=int, default=20_000)
+    ap.add_argument("--compare", type=str, default=None, help="earlier results JSON to compare against")
+    args = ap.parse_args(argv)
+    results = []
+    for n in args.sizes:
+        print(f"[bench] {n} games")
+        results += run_size(n, memory=not args.no_memory, wf_max_games=args.wf_max_games)
+    report = {"meta": _meta(), "results": results}
+    Path(args.out).write_text(json.dumps(report, indent=2))
+    print(f"Wrote {args.out}")
+    if args.compare:
+        print(f"[bench] vs {args.compare}")
+        compare(results, json.loads(Path(args.compare).read_text())["results"])
+
+if __name__ == "__main__":
+    main()
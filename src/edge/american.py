@@ -1,12 +1,17 @@
+import numpy as np
+
+def prob_to_american_array(p) -> np.ndarray:
+    p = np.clip(np.asarray(p, dtype=float), 1e-6, 1 - 1e-6)
+    raw = np.where(p >= 0.5, -(p / (1 - p)) * 100.0, ((1 - p) / p) * 100.0)
+    rounded = (5 * np.round(raw / 5)).astype(int)
+    return np.where(rounded == 0, 100, rounded)
+
+def american_str_array(vals) -> np.ndarray:
+    vals = np.asarray(vals, dtype=int)
+    return np.where(vals > 0, "+", "").astype(object) + vals.astype(str).astype(object)
+
 def prob_to_american(p: float) -> int:
-    p = min(max(p, 1e-6), 1 - 1e-6)
-    if p >= 0.5:
-        raw = - (p / (1 - p)) * 100.0
-    else:
-        raw = ((1 - p) / p) * 100.0
-    rounded = int(5 * round(raw / 5))
-    if rounded == 0: rounded = 100
-    return rounded
+    return int(prob_to_american_array([p])[0])
 
 def american_str(val: int) -> str:
-    return f"+{val}" if val > 0 else f"{val}"
+    return str(american_str_array([val])[0])
@@ -0,0 +1,205 @@
+"""
+Market lines: bulk ingestion of odds snapshots and vectorized edge against the model.
+
+Input files (CSV or Parquet) hold one row per book snapshot of one market:
+
+    date, home, away, book, ts, market, line, price_a, price_b
+
+market is ml / spread / total (moneyline, h2h, spreads, totals are accepted too).
+Side a is home for ml and spread and over for total. home_price / away_price (ml and
+spread rows) and over_price / under_price (total rows) fill in for price_a / price_b.
+line is the home spread for spread and the total for total (empty for ml); prices
+are American.
+
+OddsStore keeps them as <root>/<league>/<year>.parquet, deduplicated and sorted by
+(date, home, away, market, book, ts) with categorical text columns, so closing-line
+selection is a single drop_duplicates and loads can filter on date.
+
+market_edges() joins the closing line of every book with walk-forward predictions
+and returns, per row, the model probability of side a, the vig-free market
+probability, edge and expected value per unit staked for both sides.
+"""
+import argparse
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from scipy.special import ndtr
+
+from ..render_html import spread_from_prob_array
+
+DEFAULT_DIR = "data/cache/odds"
+KEY = ["date", "home", "away", "market", "book"]
+COLS = KEY + ["ts", "line", "price_a", "price_b"]
+MARKETS = {"ml": "ml", "moneyline": "ml", "h2h": "ml", "spread": "spread", "spreads": "spread",
+           "total": "total", "totals": "total"}
+# price column -> (alias for ml / spread rows, alias for total rows)
+PRICE_ALIASES = {"price_a": ("home_price", "over_price"), "price_b": ("away_price", "under_price")}
+
+# Standard deviation of the final margin / total around the model's number, per league.
+MARGIN_SD = {"NFL": 13.5, "CFB": 15.5, "NBA": 12.0, "MLB": 4.2}
+TOTAL_SD = {"NFL": 10.0, "CFB": 14.0, "NBA": 17.5, "MLB": 4.4}
+DEFAULT_SD = 12.0
+
+def american_to_decimal(a) -> np.ndarray:
+    a = np.asarray(a, dtype=float)
+    return np.where(a > 0, 1 + a / 100.0, 1 + 100.0 / np.abs(a))
+
+def implied_prob(a) -> np.ndarray:
+    return 1.0 / american_to_decimal(a)
+
+def devig(p_a, p_b, method="multiplicative"):
+    """Vig-free probabilities of both sides from their implied probabilities.
+    multiplicative scales both by the overround; additive removes half of it from each."""
+    p_a = np.asarray(p_a, dtype=float); p_b = np.asarray(p_b, dtype=float)
+    if method == "multiplicative":
+        s = p_a + p_b
+        return p_a / s, p_b / s
+    if method == "additive":
+        over = (p_a + p_b - 1) / 2
+        return p_a - over, p_b - over
+    raise ValueError(f"unknown devig method: {method}")
+
+def expected_value(p, american) -> np.ndarray:
+    """Expected profit per unit staked at `american` odds with win probability p."""
+    return np.asarray(p, dtype=float) * american_to_decimal(american) - 1.0
+
+def read_lines(path) -> pd.DataFrame:
+    """One CSV/Parquet file of snapshots, normalized to COLS. Raises ValueError on
+    duplicate, unrecognised or missing columns, unknown markets, or no priced rows."""
+    path = Path(path)
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path, engine="pyarrow")
+    known = set(COLS) | {a for pair in PRICE_ALIASES.values() for a in pair}
+    dup = df.columns[df.columns.duplicated()].tolist()
+    unknown = [c for c in df.columns if c not in known]
+    missing = [c for c in KEY + ["ts"] if c not in df.columns]
+    if dup or unknown or missing:
+        raise ValueError(f"{path}: duplicate columns {dup}, unrecognised {unknown}, missing {missing}")
+    market = df["market"].astype(str).str.lower()
+    bad = sorted(set(market[~market.isin(list(MARKETS))]))
+    if bad:
+        raise ValueError(f"{path}: unknown markets {bad}")
+    df["market"] = market.map(MARKETS)
+    is_total = (df["market"] == "total").to_numpy()
+    for col, (team_alias, total_alias) in PRICE_ALIASES.items():
+        price = df[col].astype(float) if col in df.columns else pd.Series(np.nan, index=df.index)
+        if team_alias in df.columns:
+            price = price.fillna(df[team_alias].astype(float).where(~is_total))
+        if total_alias in df.columns:
+            price = price.fillna(df[total_alias].astype(float).where(is_total))
+        df[col] = price
+    if "line" not in df.columns:
+        df["line"] = np.nan
+    df = df.dropna(subset=["price_a", "price_b"])
+    if df.empty:
+        raise ValueError(f"{path}: no rows with both prices")
+    df["date"] = pd.to_datetime(df["date"]).dt.normalize()
+    df["ts"] = pd.to_datetime(df["ts"])
+    return df[COLS]
+
+def _compact(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.copy(deep=False)
+    for c in ("home", "away", "market", "book"):
+        if not isinstance(df[c].dtype, pd.CategoricalDtype):
+            df[c] = df[c].astype(str).astype("category")
+    for c in ("line", "price_a", "price_b"):
+        df[c] = df[c].astype(np.float32)
+    return df
+
+class OddsStore:
+    def __init__(self, root: str | Path = DEFAULT_DIR):
+        self.root = Path(root)
+
+    def _dir(self, league: str) -> Path:
+        return self.root / league.lower()
+
+    def ingest(self, league: str, paths) -> int:
+        """Add snapshot files; rows already stored (same KEY and ts) are replaced. Returns rows read."""
+        new = pd.concat([read_lines(p) for p in paths], ignore_index=True)
+        d = self._dir(league); d.mkdir(parents=True, exist_ok=True)
+        for year, part in new.groupby(new["date"].dt.year, sort=True):
+            path = d / f"{year}.parquet"
+            if path.exists():
+                part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+            part = _compact(part).drop_duplicates(KEY + ["ts"], keep="last")
+            part.sort_values(KEY + ["ts"], kind="stable").to_parquet(path, index=False)
+        return len(new)
+
+    def load(self, league: str, start=None, end=None) -> pd.DataFrame:
+        """Snapshots with start <= date <= end (inclusive; either bound optional)."""
+        paths = sorted(self._dir(league).glob("*.parquet"))
+        if start is not None:
+            paths = [p for p in paths if int(p.stem) >= pd.Timestamp(start).year]
+        if end is not None:
+            paths = [p for p in paths if int(p.stem) <= pd.Timestamp(end).year]
+        if not paths:
+            return pd.DataFrame(columns=COLS)
+        filters = ([("date", ">=", pd.Timestamp(start))] if start is not None else []) + \
+                  ([("date", "<=", pd.Timestamp(end))] if end is not None else [])
+        parts = [pd.read_parquet(p, filters=filters or None) for p in paths]
+        if len(parts) > 1:
+            # Year files carry their own categories; union them so concat keeps categoricals.
+            for c in ("home", "away", "market", "book"):
+                cats = union_categoricals([part[c] for part in parts]).categories
+                parts = [part.assign(**{c: part[c].cat.set_categories(cats)}) for part in parts]
+        return _compact(pd.concat(parts, ignore_index=True))
+
+def closing_lines(lines: pd.DataFrame, asof=None) -> pd.DataFrame:
+    """Each book's last snapshot per game and market (taken at or before `asof` if given)."""
+    if asof is not None:
+        lines = lines[lines["ts"] <= pd.Timestamp(asof)]
+    lines = lines.sort_values(KEY + ["ts"], kind="stable")
+    return lines.drop_duplicates(KEY, keep="last").reset_index(drop=True)
+
+def market_edges(preds: pd.DataFrame, lines: pd.DataFrame, league: str, asof=None, method="multiplicative") -> pd.DataFrame:
+    """Closing line of every book joined with predictions (date, home, away, p_home[,
+    pred_total]); adds p_model / p_fair / edge / ev for side a and side b, plus the
+    better side as pick / pick_ev."""
+    close = closing_lines(lines, asof)
+    keys = preds[["date", "home", "away"]].assign(date=pd.to_datetime(preds["date"]).dt.normalize())
+    for c in ("home", "away"):
+        keys[c] = keys[c].astype(str)
+    model = keys.assign(p_home=preds["p_home"].to_numpy(dtype=float),
+                        pred_total=preds["pred_total"].to_numpy(dtype=float) if "pred_total" in preds else np.nan)
+    close = close.assign(home=close["home"].astype(str), away=close["away"].astype(str))
+    out = close.merge(model.drop_duplicates(["date", "home", "away"]), on=["date", "home", "away"], how="inner")
+
+    market = out["market"].astype(str).to_numpy()
+    line = out["line"].to_numpy(dtype=float)
+    p_home = out["p_home"].to_numpy()
+    margin = spread_from_prob_array(p_home, league)
+    p_cover = ndtr((margin + line) / MARGIN_SD.get(league, DEFAULT_SD))
+    p_over = 1 - ndtr((line - out["pred_total"].to_numpy()) / TOTAL_SD.get(league, DEFAULT_SD))
+    p_a = np.select([market == "ml", market == "spread", market == "total"], [p_home, p_cover, p_over], np.nan)
+
+    fair_a, fair_b = devig(implied_prob(out["price_a"]), implied_prob(out["price_b"]), method)
+    ev_a = expected_value(p_a, out["price_a"])
+    ev_b = expected_value(1 - p_a, out["price_b"])
+    side_a = np.where(market == "total", "OVER", "HOME")
+    side_b = np.where(market == "total", "UNDER", "AWAY")
+    out = out.drop(columns=["p_home", "pred_total"]).assign(
+        p_model=p_a, p_fair=fair_a, edge_a=p_a - fair_a, edge_b=(1 - p_a) - fair_b, ev_a=ev_a, ev_b=ev_b,
+        pick=np.where(ev_a >= ev_b, side_a, side_b), pick_ev=np.fmax(ev_a, ev_b))
+    return out
+
+def best_edges(edges: pd.DataFrame) -> pd.DataFrame:
+    """The book with the highest pick_ev per game and market."""
+    edges = edges.dropna(subset=["pick_ev"])
+    return edges.sort_values("pick_ev", ascending=False, kind="stable").drop_duplicates(
+        ["date", "home", "away", "market"]).sort_values(["date", "home", "away", "market"]).reset_index(drop=True)
+
+def consensus_total(lines: pd.DataFrame, asof=None) -> pd.DataFrame:
+    """Median closing total across books per game: date, home, away, total_line."""
+    close = closing_lines(lines[lines["market"] == "total"], asof)
+    close = close.assign(home=close["home"].astype(str), away=close["away"].astype(str))
+    return close.groupby(["date", "home", "away"], as_index=False, observed=True)["line"].median().rename(
+        columns={"line": "total_line"})
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Ingest odds snapshot files into the odds store.")
+    ap.add_argument("league")
+    ap.add_argument("paths", nargs="+")
+    ap.add_argument("--root", default=DEFAULT_DIR)
+    args = ap.parse_args()
+    n = OddsStore(args.root).ingest(args.league.upper(), args.paths)
+    print(f"{args.league.upper()}: {n} snapshots ingested into {Path(args.root).resolve()}")
@@ -0,0 +1,52 @@
+"""
+Memory-lean representations for enriched league frames.
+
+compact_teams() turns home/away into categoricals over one shared team list;
+compact_features() downcasts numeric columns without changing a value: integers to
+the smallest type that holds their range (int8 for injury counts, flags and results),
+floats to float32 only where every value survives the round trip. Model inputs such
+as Elo, form and point averages therefore stay float64, so a lean run predicts the
+same as a default one and Elo resumes from exact ratings.
+"""
+import numpy as np
+import pandas as pd
+
+TEAM_COLS = ("home", "away")
+
+def frame_mb(df: pd.DataFrame) -> float:
+    return float(df.memory_usage(deep=True).sum()) / 2**20
+
+def compact_teams(df: pd.DataFrame) -> pd.DataFrame:
+    cols = [c for c in TEAM_COLS if c in df.columns]
+    if all(isinstance(df[c].dtype, pd.CategoricalDtype) for c in cols):
+        return df
+    teams = pd.Index(pd.unique(np.concatenate([df[c].astype(object).to_numpy() for c in cols]))).dropna().sort_values()
+    dtype = pd.CategoricalDtype(teams)
+    df = df.copy(deep=False)
+    for c in cols:
+        df[c] = df[c].astype(dtype)
+    return df
+
+def compact_features(df: pd.DataFrame, skip=("game_id",)) -> pd.DataFrame:
+    df = df.copy(deep=False)
+    for c in df.columns:
+        if c in skip:
+            continue
+        s = df[c]
+        if pd.api.types.is_float_dtype(s) and s.dtype != np.float32:
+            s32 = s.astype(np.float32)
+            if np.array_equal(s32.to_numpy(dtype=float), s.to_numpy(dtype=float), equal_nan=True):
+                df[c] = s32
+        elif pd.api.types.is_integer_dtype(s) and not pd.api.types.is_bool_dtype(s) and len(s):
+            df[c] = pd.to_numeric(s, downcast="integer")
+    return df
+
+def team_lookup(teams: pd.Series, values: pd.Series) -> np.ndarray:
+    """values[team] for each entry of `teams` (NaN where missing), without a merge.
+    Categorical teams are looked up once per category and expanded through the codes."""
+    values = values[~values.index.duplicated(keep="last")]
+    if isinstance(teams.dtype, pd.CategoricalDtype):
+        per_cat = values.reindex(teams.cat.categories).to_numpy(dtype=float)
+        codes = teams.cat.codes.to_numpy()
+        return np.where(codes >= 0, per_cat[codes], np.nan)
+    return teams.map(values).to_numpy(dtype=float)
@@ -0,0 +1,80 @@
+"""
+Content-addressed store of enriched league frames.
+
+An entry is keyed by a hash of the input games, FEATURE_VERSION and the enrich
+parameters, and saved as <root>/<league>/<key>.parquet with a JSON sidecar. lookup()
+also finds the longest stored entry whose games are a prefix of the current ones, so
+the caller only has to compute features for the appended games. save() deletes the
+entries that the new one extends, so a daily run keeps one entry per league and params.
+
+Bump FEATURE_VERSION whenever feature code changes what a stored row would contain.
+"""
+import hashlib, json, os
+from pathlib import Path
+import pandas as pd
+
+# 2: trends relative to a shared anchor term
+# 3: as-of injury join
+# 4: tone_n_x / tone_n_y merge columns dropped
+# 5: doubleheader game_id across the store boundary
+# 6: lean frames keep inexact float columns float64
+# 7: per-league trends anchor
+FEATURE_VERSION = "7"
+GAME_COLS = ["date","home","away","home_score","away_score","home_win"]
+DEFAULT_DIR = "data/cache/features"
+
+def games_hash(games: pd.DataFrame) -> str:
+    cols = [c for c in GAME_COLS if c in games.columns]
+    h = pd.util.hash_pandas_object(games[cols].reset_index(drop=True), index=True)
+    return hashlib.sha1(h.to_numpy().tobytes()).hexdigest()
+
+def params_hash(params: dict) -> str:
+    return hashlib.sha1(json.dumps({"version": FEATURE_VERSION, **params}, sort_keys=True, default=str).encode()).hexdigest()
+
+def file_digest(path: str | None) -> str | None:
+    """Content hash for input files that feed features (injuries/venues CSVs, GDELT daily table)."""
+    if not path or not os.path.exists(path):
+        return None
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+class FeatureStore:
+    def __init__(self, root: str | Path = DEFAULT_DIR):
+        self.root = Path(root)
+
+    def _dir(self, league: str) -> Path:
+        return self.root / league.lower()
+
+    def lookup(self, league: str, games: pd.DataFrame, params: dict):
+        """(stored frame, n) for the longest stored prefix of `games`, or (None, 0)."""
+        ph = params_hash(params)
+        best = None
+        for meta_path in self._dir(league).glob("*.json"):
+            meta = json.loads(meta_path.read_text())
+            n = meta["n_rows"]
+            if meta["params"] != ph or n > len(games) or (best and n <= best["n_rows"]):
+                continue
+            if games_hash(games.iloc[:n]) == meta["games"]:
+                best = meta
+        if best is None:
+            return None, 0
+        return pd.read_parquet(self._dir(league) / f"{best['key']}.parquet"), best["n_rows"]
+
+    def save(self, league: str, games: pd.DataFrame, params: dict, enriched: pd.DataFrame) -> str:
+        gh, ph = games_hash(games), params_hash(params)
+        key = hashlib.sha1(f"{gh}:{ph}".encode()).hexdigest()[:20]
+        d = self._dir(league); d.mkdir(parents=True, exist_ok=True)
+        enriched.to_parquet(d / f"{key}.parquet", index=False)
+        (d / f"{key}.json").write_text(json.dumps({"key": key, "n_rows": len(games), "games": gh, "params": ph}))
+        self._prune(d, key, games, ph)
+        return key
+
+    def _prune(self, d: Path, key: str, games: pd.DataFrame, ph: str):
+        """Delete shorter entries with the same params whose games are a prefix of `games`."""
+        for meta_path in d.glob("*.json"):
+            meta = json.loads(meta_path.read_text())
+            n = meta["n_rows"]
+            if meta["key"] == key or meta["params"] != ph or n > len(games):
+                continue
+            if games_hash(games.iloc[:n]) == meta["games"]:
+                (d / f"{meta['key']}.parquet").unlink(missing_ok=True)
+                meta_path.unlink()
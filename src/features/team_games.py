@@ -0,0 +1,118 @@
+"""
+One long team-game table per league (two rows per game: home side and away side),
+shared by every per-team rolling statistic.
+
+Rows carry a stable `game_id`, so stats are joined back by key: a team playing a
+doubleheader gets one row per game instead of a (date, team) fan-out.
+"""
+import numpy as np
+import pandas as pd
+
+FORM_STATS = {f"form_{w}": ("win", w) for w in (3, 5, 10)}
+TOTALS_STATS = {"pts_for_5": ("pts_for", 5), "pts_against_5": ("pts_against", 5)}
+
+def with_game_id(df: pd.DataFrame, prior: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Add a deterministic int64 `game_id` from (date, home, away, nth meeting that day).
+    `prior` holds games that `df` follows: its meetings count first, so the second game of
+    a doubleheader split across the two gets the id a full rebuild would give it."""
+    if "game_id" in df.columns:
+        return df
+    key = df[["date", "home", "away"]].copy()
+    n = key.groupby(["date", "home", "away"], sort=False).cumcount().to_numpy()
+    if prior is not None and len(df):
+        seen = prior.loc[prior["date"] >= key["date"].min(), ["date", "home", "away"]]
+        if len(seen):
+            both = pd.concat([seen, key], ignore_index=True).astype({"home": str, "away": str})
+            n = both.groupby(["date", "home", "away"], sort=False).cumcount().to_numpy()[len(seen):]
+    key["n"] = n
+    df = df.copy(deep=False)
+    df["game_id"] = pd.util.hash_pandas_object(key, index=False).to_numpy().view(np.int64)
+    return df
+
+def _stack_teams(home: pd.Series, away: pd.Series):
+    """home then away; stays categorical (codes only) when both sides share categories."""
+    if isinstance(home.dtype, pd.CategoricalDtype) and home.dtype == away.dtype:
+        codes = np.concatenate([home.cat.codes.to_numpy(), away.cat.codes.to_numpy()])
+        return pd.Categorical.from_codes(codes, dtype=home.dtype)
+    return np.concatenate([home.to_numpy(), away.to_numpy()])
+
+def team_games(df: pd.DataFrame) -> pd.DataFrame:
+    """Long table: game_id, date, side, team, win, pts_for, pts_against; date-ordered."""
+    df = with_game_id(df)
+    n = len(df)
+    has_score = "home_score" in df.columns and "away_score" in df.columns
+    hw = df["home_win"].to_numpy(dtype=float) if "home_win" in df.columns else np.full(n, np.nan)
+    hs = df["home_score"].to_numpy(dtype=float) if has_score else np.full(n, np.nan)
+    as_ = df["away_score"].to_numpy(dtype=float) if has_score else np.full(n, np.nan)
+    # Stable (date, pos) order, home before away within a game; each column is built
+    # straight into that order so no unsorted copy of the table is kept.
+    pos = np.tile(np.arange(n), 2)
+    order = np.lexsort((pos, np.tile(df["date"].to_numpy(), 2)))
+    pos = pos[order]
+    home = order < n
+    return pd.DataFrame({
+        "game_id": df["game_id"].to_numpy()[pos],
+        "date": df["date"].to_numpy()[pos],
+        "pos": pos,
+        "side": pd.Categorical.from_codes((~home).astype(np.int8), ["home", "away"]),
+        "team": _stack_teams(df["home"], df["away"])[order],
+        "win": np.where(home, hw[pos], 1 - hw[pos]),
+        "pts_for": np.where(home, hs[pos], as_[pos]),
+        "pts_against": np.where(home, as_[pos], hs[pos]),
+    })
+
+def _prev_rolling_means(long: pd.DataFrame, stats: dict) -> dict:
+    """name -> mean of each row's previous <= w non-NaN values of its team (NaN if none),
+    for rows of `long` in date order. Equivalent to groupby(team).shift(1).rolling(w,
+    min_periods=1).mean(), computed from per-team prefix sums one column at a time."""
+    codes = pd.factorize(long["team"], use_na_sentinel=False)[0]
+    order = np.argsort(codes, kind="stable")
+    c = codes[order]
+    start = np.r_[0, np.flatnonzero(c[1:] != c[:-1]) + 1]
+    first = np.repeat(start, np.diff(np.r_[start, len(c)]))
+    i = np.arange(len(c))
+    out = {}
+    for v in sorted({v for v, _ in stats.values()}):
+        x = long[v].to_numpy(dtype=float)[order]
+        ok = ~np.isnan(x)
+        # S[k] / N[k]: sum / count of the first k rows in team order; previous rows are [first, i).
+        S = np.r_[0.0, np.cumsum(np.where(ok, x, 0.0))]
+        N = np.r_[0, np.cumsum(ok)]
+        for name, (vv, w) in stats.items():
+            if vv != v:
+                continue
+            lo = np.maximum(first, i - w)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                r = (S[i] - S[lo]) / (N[i] - N[lo])
+            out[name] = np.empty_like(r)
+            out[name][order] = r
+    return out
+
+def add_team_rolling(df: pd.DataFrame, stats: dict, long: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Add home_<name> / away_<name> for each name -> (value column, window) in `stats`.
+
+    Means are over the team's previous games (home and away), excluding the game itself.
+    """
+    df = with_game_id(df)
+    long = team_games(df) if long is None else long
+    out = _prev_rolling_means(long, stats)
+    df = df.copy(deep=False)
+    gid, side = long["game_id"].to_numpy(), long["side"].to_numpy()
+    for sd in ("home", "away"):
+        rows = np.flatnonzero(side == sd)
+        rows = rows[~pd.Index(gid[rows]).duplicated()]
+        at = pd.Index(gid[rows]).get_indexer(df["game_id"].to_numpy())
+        for name in stats:
+            df[f"{sd}_{name}"] = np.where(at >= 0, out[name][rows[at]], np.nan)
+    return df
+
+def extend_team_rolling(history: pd.DataFrame, new: pd.DataFrame, stats: dict) -> pd.DataFrame:
+    """add_team_rolling for `new` games that follow `history`, reading only each team's
+    last max-window games from `history` rather than replaying it all."""
+    w = max(w for _, w in stats.values())
+    hist_long = team_games(history)
+    recent = hist_long.groupby("team", sort=False).tail(w)
+    ctx = with_game_id(history).iloc[np.unique(recent["pos"].to_numpy())]
+    cols = [c for c in ctx.columns if c in new.columns or c == "game_id"]
+    both = pd.concat([ctx[cols], with_game_id(new, prior=history)], ignore_index=True)
+    return add_team_rolling(both, stats).iloc[len(ctx):].reset_index(drop=True)
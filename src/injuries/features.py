@@ -4,41 +4,66 @@ Injury features from free sources (CSV driven).
 CSV schema (example):
     date,league,team,starters_out,key_players_out,total_out
 
-The function merges on (date, team) and produces features for home/away.
+The file is read and indexed once per run (InjuryStore, cached per path and mtime).
+Each game takes, for home and away, the most recent report for that team filed at or
+before the game date and at most `max_staleness_days` old; otherwise the counts are 0.
 """
+import os
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 
-def add_injury_features(df: pd.DataFrame, league: str, injuries_csv_path: str | None = None) -> pd.DataFrame:
-    df = df.copy()
-    cols = ["inj_home_starters_out","inj_home_key_out","inj_home_total_out",
-            "inj_away_starters_out","inj_away_key_out","inj_away_total_out"]
-    for c in cols:
-        df[c] = 0
-
-    if not injuries_csv_path:
-        return df
-
-    inj = pd.read_csv(injuries_csv_path, parse_dates=["date"])
-    inj = inj[inj["league"].str.upper() == league.upper()].copy()
-    inj["date"] = inj["date"].dt.normalize()
-
-    h = inj.rename(columns={
-        "team":"home",
-        "starters_out":"inj_home_starters_out",
-        "key_players_out":"inj_home_key_out",
-        "total_out":"inj_home_total_out",
-    })
-    df = df.merge(h[["date","home","inj_home_starters_out","inj_home_key_out","inj_home_total_out"]],
-                  on=["date","home"], how="left")
-
-    a = inj.rename(columns={
-        "team":"away",
-        "starters_out":"inj_away_starters_out",
-        "key_players_out":"inj_away_key_out",
-        "total_out":"inj_away_total_out",
-    })
-    df = df.merge(a[["date","away","inj_away_starters_out","inj_away_key_out","inj_away_total_out"]],
-                  on=["date","away"], how="left")
-
-    df[cols] = df[cols].fillna(0).astype(int)
+INJ_COLS = {"starters_out": "starters_out", "key_players_out": "key_out", "total_out": "total_out"}
+MAX_STALENESS_DAYS = 7
+
+class InjuryStore:
+    def __init__(self, inj: pd.DataFrame):
+        inj = inj.copy()
+        inj["date"] = pd.to_datetime(inj["date"]).dt.normalize()
+        inj["league"] = inj["league"].str.upper()
+        inj = inj.sort_values("date", kind="stable")
+        self.by_league = {lg: g[["date", "team", *INJ_COLS]].reset_index(drop=True)
+                          for lg, g in inj.groupby("league", sort=False)}
+
+    @classmethod
+    def load(cls, path: str) -> "InjuryStore":
+        return _load_store(os.path.abspath(path), os.path.getmtime(path))
+
+    def league(self, league: str) -> pd.DataFrame:
+        return self.by_league.get(league.upper(), pd.DataFrame(columns=["date", "team", *INJ_COLS]))
+
+    def asof(self, dates, teams, league: str, max_staleness_days=MAX_STALENESS_DAYS) -> pd.DataFrame:
+        """Latest report per (date, team) pair, at or before the date; 0 where none."""
+        dates = pd.to_datetime(pd.Series(dates)).to_numpy()
+        order = np.argsort(dates, kind="stable")
+        left = pd.DataFrame({"date": dates[order], "team": np.asarray(teams, dtype=object)[order]})
+        right = self.league(league)
+        if right.empty:
+            return pd.DataFrame(0, index=range(len(dates)), columns=list(INJ_COLS))
+        right = right.astype({"date": left["date"].dtype})
+        m = pd.merge_asof(left, right, on="date", by="team", direction="backward",
+                          tolerance=pd.Timedelta(days=max_staleness_days))
+        out = np.zeros((len(dates), len(INJ_COLS)), dtype=int)
+        out[order] = m[list(INJ_COLS)].fillna(0).to_numpy(dtype=int)
+        return pd.DataFrame(out, columns=list(INJ_COLS))
+
+@lru_cache(maxsize=8)
+def _load_store(path: str, mtime: float) -> InjuryStore:
+    return InjuryStore(pd.read_csv(path))
+
+def add_injury_features(df: pd.DataFrame, league: str, injuries_csv_path: str | None = None,
+                        store: InjuryStore | None = None, max_staleness_days=MAX_STALENESS_DAYS) -> pd.DataFrame:
+    if store is None and injuries_csv_path:
+        store = InjuryStore.load(injuries_csv_path)
+    cols = {}
+    for side in ("home", "away"):
+        if store is None:
+            vals = pd.DataFrame(0, index=range(len(df)), columns=list(INJ_COLS))
+        else:
+            vals = store.asof(df["date"], df[side], league, max_staleness_days)
+        for src, name in INJ_COLS.items():
+            cols[f"inj_{side}_{name}"] = vals[src].to_numpy()
+    df = df.copy(deep=False)
+    for c, v in cols.items():
+        df[c] = v
     return df
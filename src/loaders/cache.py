@@ -0,0 +1,75 @@
+"""
+Per-season Parquet cache for the league loaders.
+
+Layout:  <cache_dir>/<league>/<season>.parquet          (closed season, never refetched)
+         <cache_dir>/<league>/<season>.partial.parquet  (in-progress season, refetched every run;
+                                                         read instead when that fetch fails)
+
+cache_dir defaults to $SPORTS_EDGE_CACHE or data/cache; pass cache_dir=False to bypass.
+"""
+import os
+from datetime import date
+from pathlib import Path
+import pandas as pd
+
+DEFAULT_DIR = "data/cache"
+
+# (years after the season label, month) from which a season is over and immutable.
+SEASON_CLOSES = {"nfl": (1, 3), "cfb": (1, 2), "nba": (1, 7), "mlb": (0, 12)}
+
+def season_closed(league: str, season: int, today: date | None = None) -> bool:
+    today = today or date.today()
+    off, month = SEASON_CLOSES[league]
+    return today >= date(season + off, month, 1)
+
+def cache_root(cache_dir=None) -> Path | None:
+    if cache_dir is False:
+        return None
+    return Path(cache_dir or os.environ.get("SPORTS_EDGE_CACHE", DEFAULT_DIR))
+
+def load_seasons(league: str, seasons, fetch, cache_dir=None, today: date | None = None) -> pd.DataFrame:
+    """Return normalized results for `seasons`, fetching only what the cache lacks.
+
+    fetch(list_of_seasons) must return the loader's normalized frame plus a `season`
+    column; whatever it returns is split and written per season.
+    """
+    seasons = list(seasons)
+    root = cache_root(cache_dir)
+    if root is None:
+        df = fetch(seasons)
+        return df.drop(columns=["season"]).sort_values("date").reset_index(drop=True)
+
+    d = root / league
+    frames, missing = [], []
+    for s in seasons:
+        p = d / f"{s}.parquet"
+        if p.exists():
+            frames.append(pd.read_parquet(p))
+        else:
+            missing.append(s)
+    if missing:
+        try:
+            fresh = fetch(missing)
+        except Exception as e:
+            partials = [d / f"{s}.partial.parquet" for s in missing]
+            if not all(p.exists() for p in partials):
+                raise
+            print(f"[{league}] fetch failed ({e!r}); using cached partial seasons {missing}")
+            fresh = pd.concat([pd.read_parquet(p) for p in partials], ignore_index=True)
+        else:
+            d.mkdir(parents=True, exist_ok=True)
+            for s in missing:
+                part = fresh[fresh["season"] == s].reset_index(drop=True)
+                closed = season_closed(league, s, today)
+                if closed and part.empty:
+                    continue
+                part.to_parquet(d / (f"{s}.parquet" if closed else f"{s}.partial.parquet"), index=False)
+                if closed:
+                    (d / f"{s}.partial.parquet").unlink(missing_ok=True)
+        frames.append(fresh)
+    cols = ["date","home","away","home_score","away_score","home_win"]
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=cols)
+    df = pd.concat(frames, ignore_index=True)
+    return df.drop(columns=["season"]).sort_values("date", kind="stable").reset_index(drop=True)
@@ -1,10 +1,11 @@
 import pandas as pd
+from .cache import load_seasons
 
 SCHED = "https://raw.githubusercontent.com/sportsdataverse/cfbfastR-data/master/schedules/season_schedules.csv.gz"
 
-def load_cfb_results(start_season: int, end_season: int) -> pd.DataFrame:
+def _fetch(seasons) -> pd.DataFrame:
     df = pd.read_csv(SCHED, compression="infer", low_memory=False)
-    df = df[(df["season"] >= start_season) & (df["season"] <= end_season)]
+    df = df[df["season"].isin(seasons)]
     df = df[df["game_status"] == "Final"]
     df = df.rename(columns={
         "start_date": "date", "home_team": "home", "away_team": "away",
@@ -12,4 +13,7 @@ def load_cfb_results(start_season: int, end_season: int) -> pd.DataFrame:
     })
     df["date"] = pd.to_datetime(df["date"]).dt.tz_localize(None)
     df["home_win"] = (df["home_score"] > df["away_score"]).astype(int)
-    return df[["date","home","away","home_score","away_score","home_win"]].sort_values("date").reset_index(drop=True)
+    return df[["season","date","home","away","home_score","away_score","home_win"]]
+
+def load_cfb_results(start_season: int, end_season: int, cache_dir=None) -> pd.DataFrame:
+    return load_seasons("cfb", range(start_season, end_season + 1), _fetch, cache_dir)
@@ -0,0 +1,47 @@
+"""
+Shared HTTP layer for the JSON loaders: one pooled requests.Session per process,
+retries through utils.backoff_sleep, and bounded thread-pool fan-out.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from ..utils import backoff_sleep
+
+MAX_WORKERS = 8
+RETRIES = 4
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_session = None
+_session_pid = None
+
+def session() -> requests.Session:
+    global _session, _session_pid
+    if _session is None or _session_pid != os.getpid():
+        s = requests.Session()
+        adapter = HTTPAdapter(pool_connections=MAX_WORKERS, pool_maxsize=MAX_WORKERS)
+        s.mount("http://", adapter); s.mount("https://", adapter)
+        _session, _session_pid = s, os.getpid()
+    return _session
+
+def get_json(url: str, params=None, timeout=60, retries=RETRIES, sleep=None):
+    sleep = sleep or backoff_sleep
+    for attempt in range(retries + 1):
+        try:
+            r = session().get(url, params=params, timeout=timeout)
+            if r.status_code in RETRY_STATUS and attempt < retries:
+                sleep(attempt); continue
+            r.raise_for_status()
+            return r.json()
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt >= retries:
+                raise
+            sleep(attempt)
+
+def map_json(calls, max_workers=MAX_WORKERS):
+    """get_json over (url, params) pairs concurrently; results come back in input order."""
+    calls = list(calls)
+    if len(calls) <= 1 or max_workers <= 1:
+        return [get_json(u, p) for u, p in calls]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as ex:
+        return list(ex.map(lambda c: get_json(*c), calls))
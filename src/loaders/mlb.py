@@ -1,12 +1,13 @@
-import requests, pandas as pd
+import pandas as pd
+from .cache import load_seasons
+from .fetch import map_json
 BASE = "https://statsapi.mlb.com/api/v1"
 
-def load_mlb_results(start_season: int, end_season: int) -> pd.DataFrame:
+def _fetch(seasons) -> pd.DataFrame:
     frames = []
-    for season in range(start_season, end_season + 1):
-        url = f"{BASE}/schedule?sportId=1&season={season}"
-        r = requests.get(url, timeout=60); r.raise_for_status()
-        data = r.json().get("dates", [])
+    payloads = map_json((f"{BASE}/schedule", {"sportId": 1, "season": s}) for s in seasons)
+    for season, j in zip(seasons, payloads):
+        data = j.get("dates", [])
         rows = []
         for d in data:
             for g in d.get("games", []):
@@ -17,10 +18,14 @@ def load_mlb_results(start_season: int, end_season: int) -> pd.DataFrame:
                     "home_score": g.get("teams", {}).get("home", {}).get("score"),
                     "away_score": g.get("teams", {}).get("away", {}).get("score"),
                 })
-        df = pd.DataFrame(rows)
+        df = pd.DataFrame(rows, columns=["date","home","away","home_score","away_score"])
         df["date"] = pd.to_datetime(df["date"])
+        df["season"] = season
         frames.append(df)
     mlb = pd.concat(frames, ignore_index=True)
     mlb = mlb.dropna(subset=["home_score","away_score"])
     mlb["home_win"] = (mlb["home_score"] > mlb["away_score"]).astype(int)
-    return mlb.sort_values("date").reset_index(drop=True)
+    return mlb
+
+def load_mlb_results(start_season: int, end_season: int, cache_dir=None) -> pd.DataFrame:
+    return load_seasons("mlb", range(start_season, end_season + 1), _fetch, cache_dir)
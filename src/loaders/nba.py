@@ -1,30 +1,35 @@
-import requests, pandas as pd
+import pandas as pd
+from .cache import load_seasons
+from .fetch import get_json, map_json
 BASE = "https://www.balldontlie.io/api/v1"
 
 def _fetch(endpoint, params):
-    out = []; page = 1
-    while True:
-        r = requests.get(f"{BASE}/{endpoint}", params={**params, "page": page, "per_page": 100}, timeout=60)
-        r.raise_for_status(); j = r.json()
-        out.extend(j.get("data", []))
-        if page >= j.get("meta", {}).get("total_pages", 1): break
-        page += 1
+    url = f"{BASE}/{endpoint}"
+    j = get_json(url, {**params, "page": 1, "per_page": 100})
+    out = list(j.get("data", []))
+    pages = j.get("meta", {}).get("total_pages", 1)
+    for jp in map_json((url, {**params, "page": p, "per_page": 100}) for p in range(2, pages + 1)):
+        out.extend(jp.get("data", []))
     return out
 
-def load_nba_results(start_season: int, end_season: int) -> pd.DataFrame:
+def _fetch_seasons(seasons) -> pd.DataFrame:
     rows = []
-    for yr in range(start_season, end_season + 1):
+    for yr in seasons:
         games = _fetch("games", {"seasons[]": yr})
         for g in games:
             if g.get("status") != "Final": continue
             rows.append({
+                "season": yr,
                 "date": g["date"][:10],
                 "home": g["home_team"]["full_name"],
                 "away": g["visitor_team"]["full_name"],
                 "home_score": g["home_team_score"],
                 "away_score": g["visitor_team_score"],
             })
-    df = pd.DataFrame(rows)
+    df = pd.DataFrame(rows, columns=["season","date","home","away","home_score","away_score"])
     df["date"] = pd.to_datetime(df["date"])
     df["home_win"] = (df["home_score"] > df["away_score"]).astype(int)
-    return df.sort_values("date").reset_index(drop=True)
+    return df
+
+def load_nba_results(start_season: int, end_season: int, cache_dir=None) -> pd.DataFrame:
+    return load_seasons("nba", range(start_season, end_season + 1), _fetch_seasons, cache_dir)
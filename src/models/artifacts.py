@@ -0,0 +1,82 @@
+"""
+Persisted per-league models for the scoring-only daily run.
+
+<root>/<league>/model.pkl holds the win classifier, the totals regressor and their
+metadata (feature lists, training cutoff, hash of the training games). A daily run
+loads them and scores the recent slate; it retrains only when the schedule says so
+or when the games the models were trained on have changed upstream.
+"""
+import json, pickle
+from datetime import datetime, timezone
+from pathlib import Path
+import pandas as pd
+from .train import train_model, FEATURES
+from .totals import train_totals_model, _add_team_totals_rolling, TOTAL_FEATURES
+from ..features.store import games_hash
+
+DEFAULT_DIR = "data/models"
+
+def _path(root, league: str) -> Path:
+    return Path(root) / league.lower() / "model.pkl"
+
+def train_artifacts(df: pd.DataFrame, cutoff: pd.Timestamp) -> dict:
+    train = df[df["date"] <= cutoff]
+    clf, _ = train_model(train, cv=False)
+    reg, _ = train_totals_model(train, cv=False)
+    return {"clf": clf, "reg": reg, "meta": {
+        "features": list(FEATURES), "total_features": list(TOTAL_FEATURES),
+        "cutoff": cutoff.isoformat(), "n_train": len(train), "data_hash": games_hash(train),
+        "trained_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+    }}
+
+def save_artifacts(art: dict, root, league: str) -> None:
+    p = _path(root, league); p.parent.mkdir(parents=True, exist_ok=True)
+    with open(p, "wb") as f:
+        pickle.dump(art, f)
+    p.with_suffix(".json").write_text(json.dumps(art["meta"], indent=2))
+
+def load_artifacts(root, league: str) -> dict | None:
+    p = _path(root, league)
+    if not p.exists():
+        return None
+    with open(p, "rb") as f:
+        return pickle.load(f)
+
+def needs_retrain(art: dict | None, df: pd.DataFrame, horizon_days=14, retrain_every_n_days=7) -> str | None:
+    """Reason to retrain, or None if the stored models are still current."""
+    if art is None:
+        return "no saved model"
+    meta = art["meta"]
+    if meta["features"] != list(FEATURES) or meta["total_features"] != list(TOTAL_FEATURES):
+        return "feature list changed"
+    cutoff = pd.Timestamp(meta["cutoff"])
+    if df["date"].max() - cutoff > pd.Timedelta(days=horizon_days + retrain_every_n_days):
+        return "schedule"
+    if games_hash(df[df["date"] <= cutoff]) != meta["data_hash"]:
+        return "training data changed"
+    return None
+
+def score(art: dict, games: pd.DataFrame) -> pd.DataFrame:
+    X = games.reindex(columns=art["meta"]["features"]).fillna(0.0)
+    out = games[["date","home","away","home_win"]].copy()
+    out["p_home"] = art["clf"].predict_proba(X)[:,1]
+    tg = _add_team_totals_rolling(games)
+    out["pred_total"] = art["reg"].predict(tg.reindex(columns=art["meta"]["total_features"]).fillna(0.0))
+    return out.reset_index(drop=True)
+
+def daily_scores(df: pd.DataFrame, league: str, root=DEFAULT_DIR, horizon_days=14, retrain_every_n_days=7) -> pd.DataFrame:
+    """Score the last `horizon_days` with saved models, retraining first if needed.
+
+    Models are trained on games up to max date - horizon_days, so the scored slate is
+    always out of sample, as in the walk-forward report.
+    """
+    df = df.sort_values("date", kind="stable").reset_index(drop=True)
+    art = load_artifacts(root, league)
+    reason = needs_retrain(art, df, horizon_days, retrain_every_n_days)
+    if reason:
+        print(f"[{league}] retraining models ({reason})")
+        art = train_artifacts(df, df["date"].max() - pd.Timedelta(days=horizon_days))
+        save_artifacts(art, root, league)
+    cutoff = pd.Timestamp(art["meta"]["cutoff"])
+    slate = df[(df["date"] > cutoff) & (df["date"] >= df["date"].max() - pd.Timedelta(days=horizon_days))]
+    return score(art, slate)
@@ -1,20 +1,113 @@
+import numpy as np
 import pandas as pd
-from datetime import timedelta
-from .train import train_model, FEATURES
+from functools import partial
+from sklearn.metrics import brier_score_loss, log_loss, roc_auc_score
+from sklearn.model_selection import TimeSeriesSplit
+from .train import FEATURES, CLF_PARAMS
+from .parallel import window_cutoffs, run_windows
+from .windows import WindowData, first_window_rows
 
-def walk_forward(df: pd.DataFrame, initial_days=365, retrain_every_n_days=7):
-    df = df.sort_values('date').reset_index(drop=True)
-    start_cut = df['date'].min() + pd.Timedelta(days=initial_days)
-    cutoff = start_cut
-    preds = []
-    while cutoff < df['date'].max():
-        train = df[df['date'] <= cutoff]
-        test = df[(df['date'] > cutoff) & (df['date'] <= cutoff + pd.Timedelta(days=retrain_every_n_days))]
-        if len(test) == 0: break
-        model, cv = train_model(train)
-        proba = model.predict_proba(test[FEATURES].fillna(0.0))[:,1]
-        tmp = test[['date','home','away','home_win']].copy()
+def _drift(y, p_warm, p_full):
+    # Loss deltas are over played games only; unplayed ones have no home_win yet.
+    y = np.asarray(y, dtype=float); p_warm = np.asarray(p_warm); p_full = np.asarray(p_full)
+    out = {"drift_mean_abs": float(np.mean(np.abs(p_warm - p_full))), "drift_logloss": np.nan, "drift_brier": np.nan}
+    played = ~np.isnan(y)
+    if played.any():
+        y, p_warm, p_full = y[played], p_warm[played], p_full[played]
+        out["drift_logloss"] = log_loss(y, p_warm, labels=[0,1]) - log_loss(y, p_full, labels=[0,1])
+        out["drift_brier"] = brier_score_loss(y, p_warm) - brier_score_loss(y, p_full)
+    return out
+
+def _cv_metrics(data: WindowData, n_train):
+    """5-fold time-series CV over the window's labeled rows, as train_model(cv=True)."""
+    rows, metrics = data.rows(0, n_train), []
+    for tr, te in TimeSeriesSplit(n_splits=5).split(rows):
+        p = data.fit(rows[tr]).predict(data.X[rows[te]])
+        y = data.y[rows[te]]
+        metrics.append({"brier": brier_score_loss(y, p), "logloss": log_loss(y, p, labels=[0,1]), "auc": roc_auc_score(y, p)})
+    return pd.DataFrame(metrics, columns=["brier","logloss","auc"])
+
+def _continue(data: WindowData, prev, start, stop, n_estimators):
+    """Warm start: boost `n_estimators` more trees from `prev` on rows [start, stop);
+    `prev` unchanged without two classes to learn from."""
+    rows = data.rows(start, stop)
+    if len(rows) == 0 or len(np.unique(data.y[rows])) < 2:
+        return prev
+    return data.fit(rows, n_estimators, init_model=prev)
+
+def _run_block(data: WindowData, block, step, incremental, incremental_trees, cv_every):
+    """Fit a run of consecutive windows. Each block starts with a full refit, so blocks
+    are independent; in incremental mode the block also warm-starts onto the window after
+    its last one, so the caller can measure drift against that window's full refit."""
+    windows, next_cutoff = block
+    model, n_seen, out = None, 0, []
+    for w, cutoff in windows:
+        n_train, end = data.bounds(cutoff, step)
+        do_cv = cv_every > 0 and w % cv_every == 0
+        row = {"cutoff": cutoff, "n_train": n_train, "n_test": end - n_train, "refit": "full"}
+        warm = None
+        if incremental and model is not None:
+            warm = _continue(data, model, n_seen, n_train, incremental_trees)
+        if warm is None or do_cv:
+            model = data.fit(data.rows(0, n_train))
+            if do_cv:
+                cv = _cv_metrics(data, n_train)
+                row.update({f"cv_{k}": v for k, v in cv.mean().items()})
+        else:
+            model, row["refit"] = warm, "incremental"
+        proba = data.predict(model, n_train, end)
+        tmp = data.keys.iloc[n_train:end].copy()
+        if warm is not None and row["refit"] == "full":
+            row.update(_drift(tmp['home_win'], data.predict(warm, n_train, end), proba))
+        n_seen = n_train
         tmp['p_home'] = proba
-        preds.append(tmp)
-        cutoff += pd.Timedelta(days=retrain_every_n_days)
-    return pd.concat(preds, ignore_index=True)
+        out.append((tmp, row))
+    p_next = None
+    if incremental and next_cutoff is not None:
+        n_next, end = data.bounds(next_cutoff, step)
+        warm = _continue(data, model, n_seen, n_next, incremental_trees)
+        p_next = data.predict(warm, n_next, end)
+    return out, p_next
+
+def walk_forward(df: pd.DataFrame, initial_days=365, retrain_every_n_days=7,
+                 incremental=False, refit_every=4, incremental_trees=50, cv_every=0,
+                 n_jobs=1, return_report=False):
+    """Weekly walk-forward of the win-probability model.
+
+    incremental=True keeps the previous window's booster and boosts `incremental_trees`
+    more trees on only the newly added games; a full refit happens every `refit_every`
+    windows. On those refit windows the warm-started model is scored too, so the report
+    shows how far it had drifted from a full refit. CV runs every `cv_every` windows
+    (0 = never; it does not affect predictions) and forces a full refit that window.
+
+    n_jobs > 1 fits windows (or, when incremental, runs of `refit_every` windows) in a
+    process pool; the output is the same as the serial path.
+
+    Features are laid out once as a date-sorted WindowData and every fit trains on a
+    row subset of one binned Dataset, with bins taken from the first training window.
+    """
+    df = df.sort_values('date').reset_index(drop=True)
+    cutoffs = list(enumerate(window_cutoffs(df, initial_days, retrain_every_n_days)))
+    if not cutoffs:
+        # Not enough history for a first window.
+        out = df[["date", "home", "away", "home_win"]].iloc[:0].assign(p_home=pd.Series(dtype=float))
+        return (out, pd.DataFrame()) if return_report else out
+    data = WindowData(df, FEATURES, "home_win", {"objective": "binary", **CLF_PARAMS},
+                      keys=("date", "home", "away", "home_win"), bin_rows=first_window_rows(df, [c for _, c in cutoffs]))
+    size = refit_every if incremental else 1
+    chunks = [cutoffs[i:i+size] for i in range(0, len(cutoffs), size)]
+    blocks = [(c, chunks[j+1][0][1] if j + 1 < len(chunks) else None) for j, c in enumerate(chunks)]
+    fn = partial(_run_block, step=pd.Timedelta(days=retrain_every_n_days), incremental=incremental,
+                 incremental_trees=incremental_trees, cv_every=cv_every)
+    results = run_windows(fn, data, blocks, n_jobs=n_jobs)
+    preds, report = [], []
+    p_warm = None
+    for out, p_next in results:
+        if p_warm is not None and out:
+            tmp, row = out[0]
+            row.update(_drift(tmp['home_win'], p_warm, tmp['p_home'].to_numpy()))
+        for tmp, row in out:
+            preds.append(tmp); report.append(row)
+        p_warm = p_next
+    out = pd.concat(preds, ignore_index=True)
+    return (out, pd.DataFrame(report)) if return_report else out
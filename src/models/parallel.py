@@ -0,0 +1,69 @@
+import copy, os
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+
+_FRAME = None
+_THREADS = None  # cores this process may use for LightGBM; None = all
+
+def set_thread_budget(n):
+    """Cap the LightGBM threads of this process (e.g. a league worker sharing the CPU)."""
+    global _THREADS
+    _THREADS = n
+
+def thread_params(n_workers=1) -> dict:
+    """{"num_threads": share} for each of `n_workers` splitting this process's cores;
+    {} when a single worker may use all of them."""
+    if _THREADS is None and n_workers <= 1:
+        return {}
+    return {"num_threads": max(1, (_THREADS or os.cpu_count() or 1) // n_workers)}
+
+def _with_threads(df, params: dict):
+    """`df` training with `params` added, if it carries LightGBM params (WindowData)."""
+    if not params or not hasattr(df, "params"):
+        return df
+    df = copy.copy(df)
+    df.params = {**df.params, **params}
+    return df
+
+def _init_worker(df, threads):
+    global _FRAME
+    set_thread_budget(threads)
+    _FRAME = _with_threads(df, thread_params())
+
+def _call(fn, task):
+    return fn(_FRAME, task)
+
+def window_cutoffs(df: pd.DataFrame, initial_days, retrain_every_n_days):
+    """Cutoffs of the weekly walk-forward; `df` must be sorted by date."""
+    step = pd.Timedelta(days=retrain_every_n_days)
+    dates = df['date']
+    cutoff, last = dates.min() + pd.Timedelta(days=initial_days), dates.max()
+    cutoffs = []
+    while cutoff < last:
+        # Stop at the first window with no games: the next game is past cutoff + step.
+        if dates.searchsorted(cutoff, side='right') == dates.searchsorted(cutoff + step, side='right'): break
+        cutoffs.append(cutoff)
+        cutoff += step
+    return cutoffs
+
+def run_windows(fn, df, tasks, n_jobs=1):
+    """Apply fn(df, task) to every task, in order. `df` is the shared input: a frame or
+    a windows.WindowData.
+
+    n_jobs > 1 sends tasks to a ProcessPoolExecutor; each worker receives `df` once
+    through the pool initializer rather than with every task, and LightGBM in each
+    worker gets an even share of the cores instead of all of them. n_jobs=-1 uses all
+    cores.
+    """
+    tasks = list(tasks)
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    if n_jobs <= 1 or len(tasks) <= 1:
+        df = _with_threads(df, thread_params())
+        return [fn(df, t) for t in tasks]
+    workers = min(n_jobs, len(tasks))
+    threads = thread_params(workers)["num_threads"]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(df, threads)) as ex:
+        # Later windows train on more rows; submitting them first keeps the tail short.
+        futs = {i: ex.submit(_call, fn, tasks[i]) for i in reversed(range(len(tasks)))}
+        return [futs[i].result() for i in range(len(tasks))]
@@ -1,7 +1,11 @@
 import pandas as pd
+from functools import partial
 from sklearn.model_selection import TimeSeriesSplit
 from lightgbm import LGBMRegressor
 from sklearn.metrics import mean_absolute_error
+from .parallel import window_cutoffs, run_windows, thread_params
+from .windows import WindowData, first_window_rows
+from ..features.team_games import add_team_rolling, TOTALS_STATS
 
 TOTAL_FEATURES = [
     "elo_home_exp",
@@ -14,65 +18,56 @@ TOTAL_FEATURES = [
     "away_pts_for_5","away_pts_against_5",
 ]
 
+REG_PARAMS = dict(learning_rate=0.03, subsample=0.8, colsample_bytree=0.8)
+
 def _add_team_totals_rolling(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
+    df = df.copy(deep=False)
     df["total_points"] = df["home_score"] + df["away_score"]
-    frames = []
-    for side in ["home","away"]:
-        tmp = df[["date", side, "home", "away", "home_score", "away_score"]].copy()
-        tmp["team"] = tmp[side]
-        tmp["pts_for"] = tmp["home_score"] if side == "home" else tmp["away_score"]
-        tmp["pts_against"] = tmp["away_score"] if side == "home" else tmp["home_score"]
-        tmp = tmp.sort_values("date")
-        tmp["pts_for_5"] = tmp.groupby("team")["pts_for"].rolling(5, min_periods=1).mean().reset_index(0,drop=True)
-        tmp["pts_against_5"] = tmp.groupby("team")["pts_against"].rolling(5, min_periods=1).mean().reset_index(0,drop=True)
-        cols = ["date", side, "pts_for_5", "pts_against_5"]
-        tmp = tmp[cols].rename(columns={
-            "pts_for_5": f"{side}_pts_for_5",
-            "pts_against_5": f"{side}_pts_against_5",
-        })
-        frames.append(tmp)
-    out = df.merge(frames[0], on=["date","home"], how="left")
-    out = out.merge(frames[1], on=["date","away"], how="left")
-    return out
+    if all(f"{side}_{name}" in df.columns for side in ("home","away") for name in TOTALS_STATS):
+        return df
+    return add_team_rolling(df, TOTALS_STATS)
 
-def train_totals_model(df: pd.DataFrame):
+def _prep_totals(df: pd.DataFrame):
+    """(X, y) for the totals regressor: rows with a final score, missing features as 0."""
     df = _add_team_totals_rolling(df)
     df = df.dropna(subset=["total_points"])
-    for col in TOTAL_FEATURES:
-        if col not in df.columns:
-            df[col] = 0.0
-    X = df[TOTAL_FEATURES].fillna(0.0)
-    y = df["total_points"]
-    reg = LGBMRegressor(n_estimators=400, learning_rate=0.03, subsample=0.8, colsample_bytree=0.8)
-    tscv = TimeSeriesSplit(n_splits=5)
+    return df.reindex(columns=TOTAL_FEATURES).fillna(0.0), df["total_points"]
+
+def fit_totals_model(X: pd.DataFrame, y: pd.Series, cv: bool = False):
+    """Fit on an already prepared feature matrix; with `cv` also return the mean
+    5-fold time-series MAE (NaN without)."""
+    reg = LGBMRegressor(n_estimators=400, **REG_PARAMS, **thread_params())
     maes = []
-    for tr, te in tscv.split(X):
-        reg.fit(X.iloc[tr], y.iloc[tr])
-        p = reg.predict(X.iloc[te])
-        maes.append(mean_absolute_error(y.iloc[te], p))
+    if cv:
+        tscv = TimeSeriesSplit(n_splits=5)
+        for tr, te in tscv.split(X):
+            reg.fit(X.iloc[tr], y.iloc[tr])
+            p = reg.predict(X.iloc[te])
+            maes.append(mean_absolute_error(y.iloc[te], p))
     reg.fit(X, y)
-    return reg, sum(maes)/len(maes)
+    return reg, sum(maes)/len(maes) if maes else float("nan")
+
+def train_totals_model(df: pd.DataFrame, cv: bool = True):
+    X, y = _prep_totals(df)
+    return fit_totals_model(X, y, cv=cv)
 
-def totals_walk_forward(df: pd.DataFrame, initial_days=365, retrain_every_n_days=7):
+def _totals_window(data: WindowData, cutoff, step):
+    n_train, end = data.bounds(cutoff, step)
+    reg = data.fit(data.rows(0, n_train))
+    tmp = data.keys.iloc[n_train:end].copy()
+    tmp['pred_total'] = data.predict(reg, n_train, end)
+    return tmp
+
+def totals_walk_forward(df: pd.DataFrame, initial_days=365, retrain_every_n_days=7, n_jobs=1):
+    """Weekly-retrained totals predictions. Features are built once into a date-sorted
+    WindowData; each window fits a row subset of its binned Dataset, without CV."""
     df = _add_team_totals_rolling(df)
     df = df.sort_values('date').reset_index(drop=True)
-    for col in TOTAL_FEATURES:
-        if col not in df.columns:
-            df[col] = 0.0
-    df[TOTAL_FEATURES] = df[TOTAL_FEATURES].fillna(0.0)
-
-    start_cut = df['date'].min() + pd.Timedelta(days=initial_days)
-    cutoff = start_cut
-    preds = []
-    while cutoff < df['date'].max():
-        train = df[df['date'] <= cutoff]
-        test = df[(df['date'] > cutoff) & (df['date'] <= cutoff + pd.Timedelta(days=retrain_every_n_days))]
-        if len(test) == 0: break
-        reg, _ = train_totals_model(train)
-        yhat = reg.predict(test[TOTAL_FEATURES])
-        tmp = test[['date','home','away']].copy()
-        tmp['pred_total'] = yhat
-        preds.append(tmp)
-        cutoff += pd.Timedelta(days=retrain_every_n_days)
+    step = pd.Timedelta(days=retrain_every_n_days)
+    cutoffs = window_cutoffs(df, initial_days, retrain_every_n_days)
+    if not cutoffs:
+        return df[["date", "home", "away"]].iloc[:0].assign(pred_total=pd.Series(dtype=float))
+    data = WindowData(df, TOTAL_FEATURES, "total_points", {"objective": "regression", **REG_PARAMS},
+                      bin_rows=first_window_rows(df, cutoffs))
+    preds = run_windows(partial(_totals_window, step=step), data, cutoffs, n_jobs=n_jobs)
     return pd.concat(preds, ignore_index=True)
@@ -2,6 +2,7 @@ import pandas as pd
 from sklearn.model_selection import TimeSeriesSplit
 from lightgbm import LGBMClassifier
 from sklearn.metrics import brier_score_loss, log_loss, roc_auc_score
+from .parallel import thread_params
 
 FEATURES = [
     "elo_home_exp",
@@ -13,24 +14,33 @@ FEATURES = [
     "temp_c","wind_kmh","prcp_mm","is_dome",
 ]
 
-def train_model(df: pd.DataFrame):
+# Shared by the sklearn wrapper and lightgbm.train (which accepts these names as aliases).
+CLF_PARAMS = dict(learning_rate=0.03, max_depth=-1, subsample=0.8, colsample_bytree=0.8)
+
+def _make_clf():
+    return LGBMClassifier(n_estimators=400, **CLF_PARAMS, **thread_params())
+
+def _prep(df: pd.DataFrame):
     df = df.dropna(subset=["home_win"])
     for col in FEATURES:
         if col not in df.columns:
             df[col] = 0.0
-    X = df[FEATURES].fillna(0.0)
-    y = df["home_win"]
-    clf = LGBMClassifier(n_estimators=400, learning_rate=0.03, max_depth=-1, subsample=0.8, colsample_bytree=0.8)
-    tscv = TimeSeriesSplit(n_splits=5)
+    return df[FEATURES].fillna(0.0), df["home_win"]
+
+def train_model(df: pd.DataFrame, cv: bool = True):
+    X, y = _prep(df)
+    clf = _make_clf()
     metrics = []
-    for tr, te in tscv.split(X):
-        clf.fit(X.iloc[tr], y.iloc[tr])
-        p = clf.predict_proba(X.iloc[te])[:,1]
-        m = {
-            "brier": brier_score_loss(y.iloc[te], p),
-            "logloss": log_loss(y.iloc[te], p, labels=[0,1]),
-            "auc": roc_auc_score(y.iloc[te], p)
-        }
-        metrics.append(m)
+    if cv:
+        tscv = TimeSeriesSplit(n_splits=5)
+        for tr, te in tscv.split(X):
+            clf.fit(X.iloc[tr], y.iloc[tr])
+            p = clf.predict_proba(X.iloc[te])[:,1]
+            m = {
+                "brier": brier_score_loss(y.iloc[te], p),
+                "logloss": log_loss(y.iloc[te], p, labels=[0,1]),
+                "auc": roc_auc_score(y.iloc[te], p)
+            }
+            metrics.append(m)
     clf.fit(X, y)
-    return clf, pd.DataFrame(metrics)
+    return clf, pd.DataFrame(metrics, columns=["brier","logloss","auc"])
@@ -0,0 +1,63 @@
+"""
+Walk-forward windows over one precomputed, date-sorted feature matrix.
+
+WindowData keeps X / y / dates as NumPy arrays, so window bounds are two
+searchsorted calls instead of boolean masks over the frame, and every fit trains
+on a row subset of one binned lightgbm.Dataset instead of re-binning a fresh X.
+Bin boundaries come from the first training window only (the rows up to
+`bin_rows`), so later test periods never shape them.
+
+The Dataset is built lazily and not pickled: each walk-forward worker process
+builds its own once.
+"""
+import numpy as np
+import pandas as pd
+import lightgbm as lgb
+
+class WindowData:
+    def __init__(self, df: pd.DataFrame, features, target: str, params: dict, keys=("date", "home", "away"), bin_rows=None):
+        """`df` must be sorted by date; missing features are 0, rows without `target` never train."""
+        self.params = dict(params)
+        self.keys = df[list(keys)].reset_index(drop=True)
+        self.dates = df["date"].to_numpy(dtype="datetime64[ns]")
+        self.X = df.reindex(columns=list(features)).fillna(0.0).to_numpy()
+        y = df[target].to_numpy(dtype=float)
+        self.labeled = ~np.isnan(y)
+        self.y = np.where(self.labeled, y, 0.0)
+        self.bin_rows = len(df) if bin_rows is None else bin_rows
+        self._ds = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_ds"] = None
+        return state
+
+    def bounds(self, cutoff, step):
+        """(n_train, end): rows [0, n_train) are dated <= cutoff, [n_train, end) are the test window."""
+        cutoff = np.datetime64(pd.Timestamp(cutoff), "ns")
+        step = np.timedelta64(pd.Timedelta(step))
+        return (int(np.searchsorted(self.dates, cutoff, side="right")),
+                int(np.searchsorted(self.dates, cutoff + step, side="right")))
+
+    def rows(self, start, stop):
+        """Labeled row indices in [start, stop)."""
+        return start + np.flatnonzero(self.labeled[start:stop])
+
+    def dataset(self) -> lgb.Dataset:
+        if self._ds is None:
+            ref = self.rows(0, self.bin_rows)
+            if not len(ref):
+                ref = self.rows(0, len(self.y))
+            ref = lgb.Dataset(self.X[ref], label=self.y[ref], params=self.params, free_raw_data=False)
+            self._ds = lgb.Dataset(self.X, label=self.y, reference=ref, params=self.params, free_raw_data=False).construct()
+        return self._ds
+
+    def fit(self, rows, n_estimators=400, init_model=None) -> lgb.Booster:
+        return lgb.train(self.params, self.dataset().subset(np.asarray(rows)), num_boost_round=n_estimators, init_model=init_model)
+
+    def predict(self, model: lgb.Booster, start, stop) -> np.ndarray:
+        return model.predict(self.X[start:stop])
+
+def first_window_rows(df: pd.DataFrame, cutoffs) -> int | None:
+    """Rows of date-sorted `df` in the first training window (None without windows)."""
+    return int(df["date"].searchsorted(cutoffs[0], side="right")) if len(cutoffs) else None
@@ -0,0 +1,101 @@
+"""
+Stage timing for run_predictions.
+
+    with stage("enrich.elo", league="NBA", rows=len(df)):
+        ...
+
+Stages are no-ops until enable() installs a Profiler, so instrumented code costs one
+global lookup when profiling is off. A Profiler records wall time and row count per
+stage, optionally the tracemalloc peak (memory=True, nested stages handled), and
+optionally a cProfile dump per top-level stage (cprofile_dir).
+"""
+from __future__ import annotations
+import cProfile, html, json, time, tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+
+_PROFILER: "Profiler | None" = None
+_NULL = nullcontext({})  # yields a scratch dict so callers can always set rec["rows"]
+
+class Profiler:
+    def __init__(self, memory: bool = False, cprofile_dir: str | Path | None = None):
+        self.memory = memory
+        self.cprofile_dir = Path(cprofile_dir) if cprofile_dir else None
+        self.records: list[dict] = []
+        self._stack: list[dict] = []
+        self._t0 = time.perf_counter()
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def stage(self, name: str, league: str | None = None, rows: int | None = None):
+        rec = {"stage": name, "league": league, "rows": rows, "depth": len(self._stack),
+               "start": round(time.perf_counter() - self._t0, 4)}
+        if self.memory:
+            cur, peak = tracemalloc.get_traced_memory()
+            if self._stack:  # keep the parent's peak before resetting it for this stage
+                self._stack[-1]["_peak"] = max(self._stack[-1]["_peak"], peak)
+            tracemalloc.reset_peak()
+            rec["_base"], rec["_peak"] = cur, cur
+        prof = cProfile.Profile() if self.cprofile_dir and not self._stack else None
+        self._stack.append(rec)
+        if prof: prof.enable()
+        t = time.perf_counter()
+        try:
+            yield rec
+        finally:
+            rec["seconds"] = round(time.perf_counter() - t, 4)
+            if prof:
+                prof.disable()
+                self.cprofile_dir.mkdir(parents=True, exist_ok=True)
+                fname = "_".join(p for p in (league, name) if p).replace("/", "_") + ".prof"
+                prof.dump_stats(self.cprofile_dir / fname)
+                rec["cprofile"] = fname
+            self._stack.pop()
+            if self.memory:
+                peak = max(rec.pop("_peak"), tracemalloc.get_traced_memory()[1])
+                rec["peak_mb"] = round((peak - rec.pop("_base")) / 2**20, 2)
+                if self._stack:
+                    self._stack[-1]["_peak"] = max(self._stack[-1]["_peak"], peak)
+            self.records.append(rec)
+
+    def write(self, out_dir: str | Path, extra_records: list[dict] = ()) -> Path:
+        """Write profile.json and profile.html to `out_dir`."""
+        out_dir = Path(out_dir); out_dir.mkdir(parents=True, exist_ok=True)
+        records = sorted([*self.records, *extra_records], key=lambda r: (r.get("league") or "", r["start"]))
+        (out_dir / "profile.json").write_text(json.dumps(records, indent=2))
+        total = max((r["seconds"] for r in records if r["depth"] == 0), default=1.0) or 1.0
+        rows = []
+        for r in records:
+            bar = int(300 * r["seconds"] / total)
+            rows.append(
+                f"<tr><td>{html.escape(r.get('league') or '')}</td>"
+                f"<td style='padding-left:{8 + 16 * r['depth']}px'>{html.escape(r['stage'])}</td>"
+                f"<td>{r['seconds']:.3f}</td><td>{'' if r.get('rows') is None else r['rows']}</td>"
+                f"<td>{'' if r.get('peak_mb') is None else r['peak_mb']}</td>"
+                f"<td><div style='background:#6366f1;height:10px;width:{min(bar, 300)}px'></div></td></tr>")
+        (out_dir / "profile.html").write_text(
+            "<!doctype html><meta charset='utf-8'><title>Run profile</title>"
+            "<style>body{font-family:Inter,Arial,sans-serif;margin:28px}td,th{padding:4px 10px;text-align:left;"
+            "border-bottom:1px solid #eee;font-size:14px}</style><h1>Run profile</h1><table>"
+            "<tr><th>League</th><th>Stage</th><th>Seconds</th><th>Rows</th><th>Peak MB</th><th></th></tr>"
+            + "".join(rows) + "</table>", encoding="utf-8")
+        return out_dir / "profile.json"
+
+def enable(memory: bool = False, cprofile_dir: str | Path | None = None) -> Profiler:
+    global _PROFILER
+    _PROFILER = Profiler(memory=memory, cprofile_dir=cprofile_dir)
+    return _PROFILER
+
+def disable() -> "Profiler | None":
+    global _PROFILER
+    prof, _PROFILER = _PROFILER, None
+    if prof is not None and prof.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return prof
+
+def stage(name: str, league: str | None = None, rows: int | None = None):
+    """Context manager timing `name`; a shared no-op when profiling is disabled."""
+    if _PROFILER is None:
+        return _NULL
+    return _PROFILER.stage(name, league=league, rows=rows)
@@ -1,41 +1,65 @@
+import json
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from .edge.american import prob_to_american, american_str
+from .edge.american import prob_to_american, american_str, prob_to_american_array, american_str_array
 
 def to_half_point(x: float) -> float:
     return round(x * 2) / 2.0
 
+# win-probability edge per point of spread
+SPREAD_COEF = {"NFL": 0.045, "CFB": 0.045, "NBA": 0.03, "MLB": 0.15}
+DEFAULT_SPREAD_COEF = 0.05
+
+def spread_from_prob_array(p_home, league: str) -> np.ndarray:
+    return (np.asarray(p_home, dtype=float) - 0.5) / SPREAD_COEF.get(league, DEFAULT_SPREAD_COEF)
+
 def spread_from_prob(p_home: float, league: str) -> float:
-    edge = (p_home - 0.5)
-    if league in ("NFL", "CFB"):
-        spread = edge / 0.045
-    elif league == "NBA":
-        spread = edge / 0.03
-    elif league == "MLB":
-        spread = edge / 0.15
+    return float(spread_from_prob_array([p_home], league)[0])
+
+def _fmt(fmt: str, x) -> np.ndarray:
+    return np.char.mod(fmt, np.asarray(x, dtype=float)).astype(object)
+
+def prediction_rows(preds: pd.DataFrame, league: str) -> pd.DataFrame:
+    """Report rows for walk-forward output (date, home, away, p_home[, pred_total, total_line]),
+    computed a column at a time."""
+    p_home = preds["p_home"].to_numpy(dtype=float)
+    p_away = 1 - p_home
+    fav = p_home >= 0.5
+    raw_spread = spread_from_prob_array(p_home, league)
+    total = preds["pred_total"].to_numpy(dtype=float) if "pred_total" in preds else np.full(len(preds), np.nan)
+    has_total = ~np.isnan(total)
+    market_total = preds["total_line"].to_numpy(dtype=float) if "total_line" in preds else np.full(len(preds), np.nan)
+    has_line = has_total & ~np.isnan(market_total)
+    ou_lean = np.where(total > market_total, "OVER ", "UNDER ").astype(object) + _fmt("%.1f", np.nan_to_num(market_total))
+    ou_lean = np.where(total == market_total, "NO EDGE", ou_lean).astype(object)  # a push
+    if league == "MLB":
+        line_str = np.where(fav, "-1.5", "+1.5").astype(object)
+        spread_lean = np.where(fav, "HOME -1.5", "AWAY +1.5").astype(object)
     else:
-        spread = edge / 0.05
-    return spread
+        line = (np.round(raw_spread * 2) + 0.0) / 2.0  # + 0.0: round() gives int 0, never -0.0
+        line_str = _fmt("%+.1f", line)
+        spread_lean = np.where(line >= 0, "HOME ", "AWAY ").astype(object) + _fmt("%.1f", np.abs(line))
+    return pd.DataFrame({
+        "Date": pd.to_datetime(preds["date"]).dt.strftime("%Y-%m-%d").to_numpy(),
+        "League": league,
+        "Matchup": (preds["away"].astype(str) + " @ " + preds["home"].astype(str)).to_numpy(),
+        "Home Win Prob": _fmt("%.1f", p_home * 100) + "%",
+        "Away Win Prob": _fmt("%.1f", p_away * 100) + "%",
+        "Home Price (American)": american_str_array(prob_to_american_array(p_home)),
+        "Away Price (American)": american_str_array(prob_to_american_array(p_away)),
+        "Pred. Spread (Home−Away)": _fmt("%+.1f", raw_spread),
+        "Model Spread Line": line_str,
+        "Pred. Total": np.where(has_total, _fmt("%.1f", np.nan_to_num(total)), "").astype(object),
+        "Model Lean – ML": np.where(fav, "HOME", "AWAY").astype(object),
+        "Model Lean – Spread": spread_lean,
+        # Without a market total (see src.edge.odds) there is nothing to lean against.
+        "Model Lean – O/U": np.where(has_line, ou_lean, np.where(has_total, "MODEL TOTAL", "NO EDGE")).astype(object),
+    })
 
-def render_html(pred_rows, out_path: Path):
-    df = pd.DataFrame(pred_rows)
-    def style(df: pd.DataFrame) -> str:
-        styled = (
-            df.style
-            .set_table_styles([
-                {"selector": "table", "props": [("border-collapse", "separate"), ("border-spacing", "0"), ("width", "100%"), ("font-family", "Inter, Arial, sans-serif"), ("font-size", "14px") ]},
-                {"selector": "thead th", "props": [("text-align", "left"), ("background-color", "#f5f7fb"), ("padding", "12px 10px"), ("font-weight", "600"), ("border-bottom", "1px solid #e5e8ef"), ("position","sticky"), ("top","0"), ("z-index","1")]},
-                {"selector": "tbody td", "props": [("padding", "10px"), ("border-bottom", "1px solid #f0f2f7")]},
-                {"selector": "tbody tr:hover", "props": [("background-color", "#fafbff")]},
-                {"selector": "caption", "props": [("caption-side", "top"), ("text-align", "left"), ("font-size", "18px"), ("font-weight", "700"), ("margin", "0 0 8px 0")]},
-            ])
-            .hide(axis="index")
-            .set_caption("Multi‑League Model Predictions (American Odds)")
-        )
-        return styled.to_html()
+CAPTION = "Multi‑League Model Predictions (American Odds)"
 
-    html_table = style(df)
-    shell = """<!doctype html>
+_HEAD = """<!doctype html>
 <html lang="en">
 <head>
 <meta charset="utf-8" />
@@ -54,6 +78,14 @@ h1 { font-size: 24px; margin: 0 0 12px 0; }
 p.summary { margin: 0 0 16px 0; color: var(--muted); }
 .codechip { display: inline-block; background: var(--chip-bg); border: 1px solid var(--border); padding: 4px 8px; border-radius: 8px; font-family: ui-monospace, monospace; font-size: 12px; color: #111827; }
 .table-wrap { overflow-x: auto; border: 1px solid var(--border); border-radius: 12px; box-shadow: 0 1px 2px rgba(0,0,0,0.04); }
+.controls { display: flex; gap: 12px; align-items: center; margin: 0 0 12px 0; color: var(--muted); font-size: 14px; }
+.controls input { padding: 6px 10px; border: 1px solid var(--border); border-radius: 8px; min-width: 240px; }
+.controls button { padding: 6px 10px; border: 1px solid var(--border); border-radius: 8px; background: var(--chip-bg); cursor: pointer; }
+table { border-collapse: separate; border-spacing: 0; width: 100%; font-family: Inter, Arial, sans-serif; font-size: 14px; }
+thead th { text-align: left; background-color: #f5f7fb; padding: 12px 10px; font-weight: 600; border-bottom: 1px solid #e5e8ef; position: sticky; top: 0; z-index: 1; cursor: pointer; white-space: nowrap; }
+tbody td { padding: 10px; border-bottom: 1px solid #f0f2f7; }
+tbody tr:hover { background-color: #fafbff; }
+caption { caption-side: top; text-align: left; font-size: 18px; font-weight: 700; margin: 0 0 8px 0; }
 </style>
 </head>
 <body>
@@ -61,8 +93,87 @@ p.summary { margin: 0 0 16px 0; color: var(--muted); }
   <p class="summary">
     American odds shown in common book increments (e.g., <span class="codechip">-110</span>, <span class="codechip">+120</span>).
   </p>
-  <div class="table-wrap">{table}</div>
+  <div class="controls">
+    <input id="q" type="search" placeholder="Filter (e.g. NBA, Lakers, 2024-01)" />
+    <button id="prev">&larr;</button><span id="pos"></span><button id="next">&rarr;</button>
+    <a id="csv" href="">CSV</a><a id="json" href="">JSON</a>
+  </div>
+  <div class="table-wrap"><table><caption>__CAPTION__</caption><thead><tr id="hdr"></tr></thead><tbody id="body"></tbody></table></div>
+<script id="data" type="application/json">
+"""
+
+_TAIL = """</script>
+<script>
+(function () {
+  var D = JSON.parse(document.getElementById("data").textContent);
+  var cols = D.columns, rows = D.rows, PAGE = D.page_size;
+  var view = rows, page = 0, sortCol = -1, sortDir = 1;
+  // Numeric only when the whole cell is a number ("+1.5", "-110", "45.3%"); dates stay strings.
+  var num = function (v) { var s = String(v).trim().replace(/[%+,]/g, ""); return /^-?\\d*\\.?\\d+$/.test(s) ? parseFloat(s) : null; };
+  var hdr = document.getElementById("hdr"), body = document.getElementById("body");
+  document.getElementById("csv").href = D.csv || "#"; document.getElementById("json").href = D.json || "#";
+  cols.forEach(function (c, i) {
+    var th = document.createElement("th"); th.textContent = c;
+    th.onclick = function () { sortDir = sortCol === i ? -sortDir : 1; sortCol = i; apply(); };
+    hdr.appendChild(th);
+  });
+  function apply() {
+    var q = document.getElementById("q").value.toLowerCase();
+    view = q ? rows.filter(function (r) { return r.join(" ").toLowerCase().indexOf(q) >= 0; }) : rows.slice();
+    if (sortCol >= 0) {
+      view.sort(function (a, b) {
+        var x = num(a[sortCol]), y = num(b[sortCol]);
+        if (x === null || y === null) { x = String(a[sortCol]); y = String(b[sortCol]); }
+        return (x < y ? -1 : x > y ? 1 : 0) * sortDir;
+      });
+    }
+    page = 0; draw();
+  }
+  function draw() {
+    var pages = Math.max(1, Math.ceil(view.length / PAGE)), html = [];
+    page = Math.min(Math.max(page, 0), pages - 1);
+    view.slice(page * PAGE, (page + 1) * PAGE).forEach(function (r) {
+      var tr = document.createElement("tr");
+      r.forEach(function (v) { var td = document.createElement("td"); td.textContent = v; tr.appendChild(td); });
+      html.push(tr);
+    });
+    body.replaceChildren.apply(body, html);
+    document.getElementById("pos").textContent = "page " + (page + 1) + " / " + pages + " (" + view.length + " rows)";
+  }
+  document.getElementById("q").oninput = apply;
+  document.getElementById("prev").onclick = function () { page--; draw(); };
+  document.getElementById("next").onclick = function () { page++; draw(); };
+  apply();
+})();
+</script>
 </body>
 </html>
-""".format(table=html_table)
-    Path(out_path).write_text(shell, encoding="utf-8")
+"""
+
+def _json(obj) -> str:
+    # "</" would end the <script> block early
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).replace("</", "<\\/")
+
+def render_html(pred_rows, out_path: Path, page_size: int = 100, export: bool = True):
+    """Write the report: rows are embedded as compact JSON and rendered client-side with
+    sorting, filtering and paging. With `export`, the same rows are written next to the
+    page as .csv and .json. `pred_rows` is a list of dicts or a DataFrame."""
+    df = pred_rows if isinstance(pred_rows, pd.DataFrame) else pd.DataFrame(pred_rows)
+    out_path = Path(out_path)
+    columns = [str(c) for c in df.columns]
+    meta = {"columns": columns, "page_size": page_size}
+    if export:
+        csv_path, json_path = out_path.with_suffix(".csv"), out_path.with_suffix(".json")
+        df.to_csv(csv_path, index=False)
+        df.to_json(json_path, orient="records", force_ascii=False)
+        meta.update(csv=csv_path.name, json=json_path.name)
+    values = df.astype(object).where(df.notna(), "").astype(str).to_numpy().tolist()
+    with open(out_path, "w", encoding="utf-8") as f:
+        f.write(_HEAD.replace("__CAPTION__", CAPTION))
+        f.write(_json(meta)[:-1] + ',"rows":[')
+        for i in range(0, len(values), 1000):
+            chunk = _json(values[i:i+1000])[1:-1]
+            if chunk:
+                f.write(("," if i else "") + chunk + "\n")
+        f.write("]}\n")
+        f.write(_TAIL)
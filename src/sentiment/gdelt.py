@@ -1,4 +1,119 @@
+"""
+Team tone from GDELT dump files read offline.
+
+ingest_gdelt_dumps() streams GKG 2.1 (*.gkg.csv[.zip]) and Events 2.0
+(*.export.CSV[.zip]) files from a local directory in chunks, matches team names with
+one precompiled alternation regex, and keeps only running (team, day) tone sums, so
+memory is bounded by teams x days however large the dumps are. The result is a
+compact daily table (date, team, tone_sum, tone_n), optionally written to Parquet.
+
+gdelt_team_tone() reads that table; without one it returns zeros as before.
+Build it with `python -m src.sentiment.gdelt <dump_dir>` (team names from the venues CSV).
+"""
+import argparse, re
+from pathlib import Path
 import pandas as pd
-def gdelt_team_tone(team_names, days: int = 14) -> pd.DataFrame:
-    # Placeholder to avoid rate-limit errors; returns zeros but keeps interface stable.
-    return pd.DataFrame({"team": list(team_names), "tone_mean": 0.0, "tone_n": 0})
+
+DEFAULT_DAILY = "data/cache/gdelt_daily.parquet"
+MIN_NAME_LEN = 4  # short codes ("KC", "GB") would match unrelated text
+
+# column positions in the tab-separated, header-less dumps
+GKG_COLS = {"date": 1, "url": 4, "orgs": 13, "tone": 15}
+EVENT_COLS = {"date": 1, "actor1": 6, "actor2": 16, "tone": 34}
+
+def _norm(s: pd.Series) -> pd.Series:
+    return s.fillna("").str.lower().str.replace(r"[^a-z0-9]+", " ", regex=True)
+
+def build_matcher(team_names):
+    """(compiled regex, normalized name -> team) for whole-word team mentions."""
+    names = {}
+    for t in team_names:
+        n = re.sub(r"[^a-z0-9]+", " ", str(t).lower()).strip()
+        if len(n) >= MIN_NAME_LEN:
+            names[n] = t
+    if not names:
+        return None, names
+    alts = "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+    return re.compile(rf"\b(?:{alts})\b"), names
+
+def _dump_kind(path: Path) -> str | None:
+    name = path.name.lower()
+    if ".gkg." in name: return "gkg"
+    if ".export." in name: return "events"
+    return None
+
+def _chunks(path: Path, kind: str, chunksize: int):
+    cols = GKG_COLS if kind == "gkg" else EVENT_COLS
+    reader = pd.read_csv(path, sep="\t", header=None, usecols=sorted(cols.values()), dtype=str,
+                         quoting=3, on_bad_lines="skip", chunksize=chunksize, encoding_errors="replace")
+    for chunk in reader:
+        chunk = chunk.rename(columns={v: k for k, v in cols.items()})
+        if kind == "gkg":
+            text = _norm(chunk["orgs"].str.replace(",", " ", regex=False)) + " " + _norm(chunk["url"])
+            tone = pd.to_numeric(chunk["tone"].str.split(",", n=1).str[0], errors="coerce")
+        else:
+            text = _norm(chunk["actor1"]) + " " + _norm(chunk["actor2"])
+            tone = pd.to_numeric(chunk["tone"], errors="coerce")
+        day = pd.to_datetime(chunk["date"].str[:8], format="%Y%m%d", errors="coerce")
+        yield text, tone, day
+
+def ingest_gdelt_dumps(dump_dir, team_names, out_path=None, chunksize: int = 100_000) -> pd.DataFrame:
+    pattern, names = build_matcher(team_names)
+    totals = None
+    if pattern is not None:
+        for path in sorted(Path(dump_dir).iterdir()):
+            kind = _dump_kind(path)
+            if kind is None:
+                continue
+            for text, tone, day in _chunks(path, kind, chunksize):
+                hits = text.str.findall(pattern).explode().dropna()
+                if hits.empty:
+                    continue
+                m = pd.DataFrame({"team": hits.map(names), "date": day.loc[hits.index], "tone": tone.loc[hits.index]})
+                # a record mentioning a team twice counts once
+                m = m.reset_index().drop_duplicates(["index", "team"]).dropna(subset=["date", "tone"])
+                agg = m.groupby(["date", "team"])["tone"].agg(tone_sum="sum", tone_n="count")
+                totals = agg if totals is None else totals.add(agg, fill_value=0)
+    if totals is None:
+        daily = pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "team": pd.Series(dtype=object),
+                              "tone_sum": pd.Series(dtype=float), "tone_n": pd.Series(dtype="int64")})
+    else:
+        daily = totals.reset_index()
+        daily["tone_n"] = daily["tone_n"].astype("int64")
+    if out_path:
+        Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+        daily.to_parquet(out_path, index=False)
+    return daily
+
+def gdelt_team_tone(team_names, days: int = 14, daily=DEFAULT_DAILY, asof=None) -> pd.DataFrame:
+    """Mean tone per team over the `days` days up to `asof` (default: last day in the table).
+
+    `daily` is a table from ingest_gdelt_dumps or a path to one; teams without
+    mentions get tone_mean 0 and tone_n 0.
+    """
+    teams = list(team_names)
+    out = pd.DataFrame({"team": teams, "tone_mean": 0.0, "tone_n": 0})
+    if isinstance(daily, (str, Path)):
+        if not Path(daily).exists():
+            return out
+        daily = pd.read_parquet(daily)
+    if daily is None or daily.empty:
+        return out
+    end = pd.Timestamp(asof) if asof is not None else daily["date"].max()
+    win = daily[(daily["date"] > end - pd.Timedelta(days=days)) & (daily["date"] <= end)]
+    g = win.groupby("team")[["tone_sum", "tone_n"]].sum()
+    g = g.reindex(teams)
+    out["tone_n"] = g["tone_n"].fillna(0).astype(int).to_numpy()
+    out["tone_mean"] = (g["tone_sum"] / g["tone_n"]).fillna(0.0).to_numpy()
+    return out
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Aggregate local GDELT dumps into the daily team tone table.")
+    ap.add_argument("dump_dir")
+    ap.add_argument("--venues_csv", default="data/venues.csv", help="team names come from its `team` column")
+    ap.add_argument("--team", action="append", default=[], help="extra team name (repeatable)")
+    ap.add_argument("--out", default=DEFAULT_DAILY)
+    args = ap.parse_args()
+    teams = sorted(set(pd.read_csv(args.venues_csv)["team"].dropna().astype(str)) | set(args.team))
+    daily = ingest_gdelt_dumps(args.dump_dir, teams, out_path=args.out)
+    print(f"{daily['team'].nunique()} of {len(teams)} teams, {len(daily)} team-days -> {Path(args.out).resolve()}")
@@ -1,16 +1,88 @@
-from pytrends.request import TrendReq
+"""
+Google Trends interest per team.
+
+pytrends allows 5 keywords per payload, so teams go out 4 at a time together with a
+shared anchor term, and each team's mean is reported relative to the anchor's mean in
+the same payload (anchor = 100). That keeps values comparable across batches and runs.
+The anchor is a mid-volume team of the league (ANCHORS), so team values are not
+squeezed towards zero by a much more searched term; an anchor that is itself one of
+the teams reports 100.
+Per-team values are cached in SQLite for `ttl_hours`; failed requests are retried
+through utils.backoff_sleep. Pass `client` (anything with build_payload and
+interest_over_time) to run without the network.
+"""
+import sqlite3, time
+from pathlib import Path
 import pandas as pd
+from ..utils import backoff_sleep
+
+ANCHORS = {"NFL": "Tennessee Titans", "NBA": "Indiana Pacers", "MLB": "Cincinnati Reds",
+           "CFB": "Iowa State Cyclones"}
+ANCHOR = ANCHORS["NBA"]  # leagues without an entry
+BATCH = 4
+DEFAULT_CACHE = "data/cache/trends.sqlite"
+
+class TrendsCache:
+    def __init__(self, path: str | Path = DEFAULT_CACHE):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as con:
+            con.execute("""CREATE TABLE IF NOT EXISTS trends (
+                team TEXT, days INTEGER, anchor TEXT, value REAL, fetched REAL,
+                PRIMARY KEY (team, days, anchor))""")
+
+    def _conn(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, teams, days: int, anchor: str, ttl_hours: float) -> dict:
+        fresh_after = time.time() - ttl_hours * 3600
+        with self._conn() as con:
+            rows = con.execute("SELECT team, value FROM trends WHERE days = ? AND anchor = ? AND fetched >= ?",
+                               (days, anchor, fresh_after)).fetchall()
+        wanted = set(teams)
+        return {t: v for t, v in rows if t in wanted}
+
+    def put(self, values: dict, days: int, anchor: str) -> None:
+        now = time.time()
+        with self._conn() as con:
+            con.executemany("INSERT OR REPLACE INTO trends VALUES (?, ?, ?, ?, ?)",
+                            [(t, days, anchor, float(v), now) for t, v in values.items()])
+
+def _default_client():
+    from pytrends.request import TrendReq
+    return TrendReq(hl='en-US', tz=360)
+
+def _fetch_batch(client, kw, days: int, retries: int):
+    for attempt in range(retries + 1):
+        try:
+            client.build_payload(kw, timeframe=f"now {days}-d", geo="US")
+            return client.interest_over_time().drop(columns=["isPartial"], errors='ignore')
+        except Exception:
+            if attempt >= retries:
+                return None
+            backoff_sleep(attempt)
 
-def trends_by_team(team_names, days: int = 14) -> pd.DataFrame:
-    pytrends = TrendReq(hl='en-US', tz=360)
-    out = []
-    terms = list(team_names)
-    for i in range(0, len(terms), 5):
-        kw = terms[i:i+5]
-        pytrends.build_payload(kw, timeframe=f"now {days}-d", geo="US")
-        interest = pytrends.interest_over_time().drop(columns=["isPartial"], errors='ignore')
-        if interest.empty: continue
-        mean_vals = interest.mean().reset_index()
-        mean_vals.columns = ["team", "trends_mean"]
-        out.append(mean_vals)
-    return pd.concat(out, ignore_index=True) if out else pd.DataFrame(columns=["team","trends_mean"])
+def trends_by_team(team_names, days: int = 14, client=None, cache: TrendsCache | None = None,
+                   ttl_hours: float = 24, anchor: str = ANCHOR, retries: int = 3) -> pd.DataFrame:
+    terms = list(dict.fromkeys(team_names))
+    values = cache.get(terms, days, anchor, ttl_hours) if cache is not None else {}
+    if anchor in terms:
+        values[anchor] = 100.0
+    todo = [t for t in terms if t not in values]
+    fetched = {}
+    for i in range(0, len(todo), BATCH):
+        kw = todo[i:i+BATCH]
+        client = client or _default_client()
+        interest = _fetch_batch(client, kw + [anchor], days, retries)
+        if interest is None or interest.empty or anchor not in interest:
+            continue
+        ref = interest[anchor].mean()
+        if not ref > 0:
+            continue
+        means = interest[[t for t in kw if t in interest]].mean()
+        fetched.update((means / ref * 100.0).to_dict())
+    if cache is not None and fetched:
+        cache.put(fetched, days, anchor)
+    values.update(fetched)
+    out = [{"team": t, "trends_mean": values[t]} for t in terms if t in values]
+    return pd.DataFrame(out, columns=["team","trends_mean"])
@@ -0,0 +1,62 @@
+"""
+Persistent store of daily weather aggregates keyed by rounded (lat, lon) and day.
+
+Past weather never changes, so only days before today are written; a run after the
+first backfill only has to fetch the new slate.
+"""
+import sqlite3
+from datetime import date
+from pathlib import Path
+import pandas as pd
+
+DEFAULT_PATH = "data/cache/weather.sqlite"
+COLS = ["temp_c", "wind_kmh", "prcp_mm"]
+ROUND = 2  # ~1 km
+
+class WeatherCache:
+    def __init__(self, path: str | Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0; self.misses = 0
+        with self._conn() as con:
+            con.execute("""CREATE TABLE IF NOT EXISTS wx (
+                lat REAL, lon REAL, day TEXT, temp_c REAL, wind_kmh REAL, prcp_mm REAL,
+                PRIMARY KEY (lat, lon, day))""")
+
+    def _conn(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    @staticmethod
+    def _keys(lat, lon, day) -> pd.DataFrame:
+        return pd.DataFrame({
+            "lat_r": pd.Series(lat, dtype=float).round(ROUND).to_numpy(),
+            "lon_r": pd.Series(lon, dtype=float).round(ROUND).to_numpy(),
+            "day_s": pd.to_datetime(pd.Series(day)).dt.strftime("%Y-%m-%d").to_numpy(),
+        })
+
+    def lookup(self, games: pd.DataFrame) -> pd.DataFrame:
+        """Cached aggregates for unique (lat, lon, day) rows of `games`; misses are NaN."""
+        keys = pd.concat([games[["lat", "lon", "day"]].reset_index(drop=True),
+                          self._keys(games["lat"], games["lon"], games["day"])], axis=1)
+        with self._conn() as con:
+            con.execute("CREATE TEMP TABLE q (lat REAL, lon REAL, day TEXT)")
+            con.executemany("INSERT INTO q VALUES (?, ?, ?)", keys[["lat_r", "lon_r", "day_s"]].itertuples(index=False))
+            got = pd.read_sql_query(
+                "SELECT wx.lat AS lat_r, wx.lon AS lon_r, wx.day AS day_s, temp_c, wind_kmh, prcp_mm "
+                "FROM wx JOIN q ON wx.lat = q.lat AND wx.lon = q.lon AND wx.day = q.day", con)
+        got = got.drop_duplicates(["lat_r", "lon_r", "day_s"])
+        out = keys.merge(got, on=["lat_r", "lon_r", "day_s"], how="left", indicator=True)
+        hit = out["_merge"] == "both"
+        self.hits += int(hit.sum()); self.misses += int((~hit).sum())
+        return out.drop(columns=["lat_r", "lon_r", "day_s", "_merge"]).assign(_hit=hit.to_numpy())
+
+    def store(self, wx: pd.DataFrame) -> None:
+        """Write fetched aggregates for past days that have at least one observation."""
+        wx = wx[(pd.to_datetime(wx["day"]) < pd.Timestamp(date.today())) & wx[COLS].notna().any(axis=1)]
+        if wx.empty:
+            return
+        rows = pd.concat([self._keys(wx["lat"], wx["lon"], wx["day"]),
+                          wx[COLS].astype(float).reset_index(drop=True)], axis=1)
+        rows = rows.astype(object).where(rows.notna(), None)
+        with self._conn() as con:
+            con.executemany("INSERT OR REPLACE INTO wx VALUES (?, ?, ?, ?, ?, ?)", rows.itertuples(index=False))
@@ -8,9 +8,11 @@ Expected venue CSV schema (user-provided, one row per home team):
     league,team,stadium,lat,lon,dome  # dome: 1 if indoor/closed
 
 Functions:
-    add_weather_features(df, league, venues_csv_path) -> df with columns:
+    add_weather_features(df, league, venues_csv_path, cache=None) -> df with columns:
         temp_c, wind_kmh, prcp_mm, is_dome
+    cache: optional weather.cache.WeatherCache; hits skip Meteostat, misses are written back.
 """
+import numpy as np
 import pandas as pd
 
 def _load_venues(venues_csv_path: str) -> pd.DataFrame:
@@ -21,53 +23,73 @@ def _load_venues(venues_csv_path: str) -> pd.DataFrame:
         raise ValueError(f"Venues CSV missing columns: {missing}")
     return ven
 
-def _meteostat_fetch(lat: float, lon: float, date: pd.Timestamp):
+WX_COLS = ["temp_c", "wind_kmh", "prcp_mm"]
+
+def _meteostat_range(lat: float, lon: float, start: pd.Timestamp, end: pd.Timestamp):
+    """Hourly observations for one location over [start, end], or None."""
     try:
         from meteostat import Hourly, Point
     except Exception:
         return None
-    point = Point(lat, lon)
-    start = pd.Timestamp(str(pd.to_datetime(date).date()))
-    end   = start + pd.Timedelta(days=1)
     try:
-        data = Hourly(point, start, end).fetch()
-        if data is None or data.empty:
-            return None
-        out = pd.DataFrame({
-            "temp_c": [data["temp"].dropna().mean() if "temp" in data else None],
-            "wind_kmh": [data["wspd"].dropna().mean() * 3.6 if "wspd" in data else None],
-            "prcp_mm": [data["prcp"].dropna().sum() if "prcp" in data else 0.0],
-        })
-        return out.iloc[0].to_dict()
+        data = Hourly(Point(lat, lon), start, end).fetch()
     except Exception:
         return None
+    if data is None or data.empty:
+        return None
+    return data
 
-def add_weather_features(df: pd.DataFrame, league: str, venues_csv_path: str) -> pd.DataFrame:
-    ven = _load_venues(venues_csv_path)
-    ven = ven[ven["league"].str.upper() == league.upper()].copy()
-    df = df.copy()
-    df["is_dome"] = 0
-
-    df = df.merge(ven[["team","lat","lon","dome"]].rename(columns={"team":"home"}), on="home", how="left")
-    df["is_dome"] = df["dome"].fillna(0).astype(int)
-    df.drop(columns=["dome"], inplace=True)
+def _daily_aggregates(hourly: pd.DataFrame) -> pd.DataFrame:
+    """Per-day temp_c / wind_kmh / prcp_mm from hourly rows, indexed by day."""
+    g = hourly.groupby(hourly.index.normalize())
+    out = pd.DataFrame(index=g.size().index)
+    out["temp_c"] = g["temp"].mean() if "temp" in hourly else None
+    out["wind_kmh"] = g["wspd"].mean() * 3.6 if "wspd" in hourly else None
+    out["prcp_mm"] = g["prcp"].sum() if "prcp" in hourly else 0.0
+    return out
 
-    wx_rows = []
-    for _, r in df.iterrows():
-        lat = r.get("lat"); lon = r.get("lon")
-        if pd.isna(lat) or pd.isna(lon):
-            wx_rows.append({"temp_c": None, "wind_kmh": None, "prcp_mm": None})
+def _fetch_venue_weather(games: pd.DataFrame) -> pd.DataFrame:
+    """One hourly request per (venue, year) covering all its game days."""
+    frames = []
+    for (lat, lon, _), grp in games.groupby(["lat", "lon", games["day"].dt.year]):
+        start, end = grp["day"].min(), grp["day"].max() + pd.Timedelta(hours=23)
+        data = _meteostat_range(float(lat), float(lon), start, end)
+        if data is None:
             continue
-        if r["is_dome"] == 1:
-            wx_rows.append({"temp_c": 21.0, "wind_kmh": 0.0, "prcp_mm": 0.0})
-            continue
-        wx = _meteostat_fetch(float(lat), float(lon), pd.to_datetime(r["date"]))
-        if wx is None:
-            wx_rows.append({"temp_c": None, "wind_kmh": None, "prcp_mm": None})
-        else:
-            wx_rows.append(wx)
+        daily = _daily_aggregates(data).reindex(pd.DatetimeIndex(grp["day"].unique()))
+        daily = daily.rename_axis("day").reset_index()
+        daily["lat"] = lat; daily["lon"] = lon
+        frames.append(daily)
+    if not frames:
+        return pd.DataFrame({"lat": pd.Series(dtype=float), "lon": pd.Series(dtype=float),
+                             "day": pd.Series(dtype=games["day"].dtype), **{c: pd.Series(dtype=float) for c in WX_COLS}})
+    return pd.concat(frames, ignore_index=True)
+
+def add_weather_features(df: pd.DataFrame, league: str, venues_csv_path: str, cache=None) -> pd.DataFrame:
+    ven = _load_venues(venues_csv_path)
+    ven = ven[ven["league"].str.upper() == league.upper()]
+    ven = ven.drop_duplicates("team", keep="first").set_index("team")
+    df = df.copy(deep=False)  # only adds columns
+
+    home = df["home"].astype(object) if isinstance(df["home"].dtype, pd.CategoricalDtype) else df["home"]
+    lat = home.map(ven["lat"]).to_numpy(dtype=float)
+    lon = home.map(ven["lon"]).to_numpy(dtype=float)
+    df["is_dome"] = home.map(ven["dome"]).fillna(0).astype(int).to_numpy()
 
-    wx_df = pd.DataFrame(wx_rows)
-    df = pd.concat([df.reset_index(drop=True), wx_df], axis=1)
-    df.drop(columns=["lat","lon"], inplace=True, errors="ignore")
+    day = pd.to_datetime(df["date"]).dt.normalize()
+    has_venue = ~np.isnan(lat) & ~np.isnan(lon)
+    outdoor = has_venue & (df["is_dome"].to_numpy() != 1)
+    games = pd.DataFrame({"lat": lat[outdoor], "lon": lon[outdoor], "day": day.to_numpy()[outdoor]}).drop_duplicates()
+    if cache is not None and len(games):
+        wx = cache.lookup(games)
+        fresh = _fetch_venue_weather(wx.loc[~wx["_hit"], ["lat", "lon", "day"]])
+        cache.store(fresh)
+        wx = pd.concat([wx.loc[wx["_hit"]].drop(columns="_hit"), fresh], ignore_index=True)
+    else:
+        wx = _fetch_venue_weather(games)
+    wx = wx.drop_duplicates(["lat", "lon", "day"]).set_index(["lat", "lon", "day"])[WX_COLS].astype(float)
+    vals = wx.reindex(pd.MultiIndex.from_arrays([lat, lon, day.to_numpy()])).to_numpy(copy=True)
+    vals[has_venue & ~outdoor] = [21.0, 0.0, 0.0]
+    for i, c in enumerate(WX_COLS):
+        df[c] = vals[:, i]
     return df
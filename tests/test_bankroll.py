@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from src.edge.bankroll import simulate_paths
+from src.edge.odds import american_to_decimal
+
+def _bets(n=300, seed=1):
+    rng = np.random.default_rng(seed)
+    p = rng.uniform(0.3, 0.7, n)
+    q = p - 0.03
+    return pd.DataFrame({"p": p, "price": np.where(q > 0.5, -100 * q / (1 - q), 100 * (1 - q) / q), "won": rng.random(n) < p})
+
+def _loop(bets, idx, kind, size, ruin):
+    """One bootstrap path (bet indices idx), a bet at a time."""
+    dec = american_to_decimal(bets["price"]); won = bets["won"].to_numpy(); p = bets["p"].to_numpy()
+    bank = peak = 1.0; mdd = staked = 0.0; ruined = False
+    for i in idx:
+        if ruined:
+            break
+        stake = size if kind == "flat" else min(size * max((p[i] * dec[i] - 1) / (dec[i] - 1), 0), 1) * bank
+        staked += stake
+        bank += stake * (dec[i] - 1) if won[i] else -stake
+        peak = max(peak, bank); mdd = max(mdd, 1 - bank / peak)
+        ruined = bank <= ruin
+    return bank, (bank - 1) / staked if staked else 0.0, mdd, ruined
+
+def test_chunks_match_per_bet_loop():
+    bets = _bets()
+    staking = {"flat": ("flat", 0.05), "kelly_2": ("kelly", 2.0), "kelly": ("kelly", 1.0)}
+    n_paths, ruin, seed = 50, 0.3, 3
+    res = simulate_paths(bets, n_paths, staking=staking, ruin=ruin, seed=seed, chunk=n_paths)
+    # One chunk: its draws come from the first child of the SeedSequence.
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+    idx = rng.integers(0, len(bets), (len(bets), n_paths))
+    for name, (kind, size) in staking.items():
+        ref = pd.DataFrame([_loop(bets, idx[:, j], kind, size, ruin) for j in range(n_paths)],
+                           columns=["final", "roi", "max_drawdown", "ruined"])
+        got = res[name]
+        np.testing.assert_allclose(got["final"], ref["final"], rtol=1e-3, atol=1e-4)
+        np.testing.assert_allclose(got["roi"], ref["roi"], rtol=1e-3, atol=1e-4)
+        np.testing.assert_allclose(got["max_drawdown"], ref["max_drawdown"], rtol=0, atol=1e-4)
+        assert (got["ruined"].to_numpy() == ref["ruined"].to_numpy()).all()
+    assert res["kelly_2"]["ruined"].any()
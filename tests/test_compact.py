@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+import run_predictions
+from src.bench.synthetic import synthetic_league
+from src.features.compact import compact_features
+from src.features.elo import final_ratings
+from src.models.backtest import walk_forward
+from src.models.totals import totals_walk_forward
+from src.render_html import prediction_rows
+
+def _no_network(monkeypatch):
+    zero = lambda teams, days=14, **kw: pd.DataFrame({"team": teams, "trends_mean": 0.0, "tone_mean": 0.0})
+    monkeypatch.setattr(run_predictions, "trends_by_team", zero)
+    monkeypatch.setattr(run_predictions, "gdelt_team_tone", zero)
+    monkeypatch.setattr(run_predictions, "TrendsCache", lambda: None)
+
+def test_compact_features_keeps_inexact_floats():
+    df = pd.DataFrame({"elo": [1500.123456789, 1499.5], "count": [1.0, np.nan], "n": [3, 4]})
+    out = compact_features(df)
+    assert out["elo"].dtype == np.float64
+    assert out["count"].dtype == np.float32
+    assert out["n"].dtype == np.int8
+
+def test_lean_enrich_predicts_like_default(monkeypatch):
+    _no_network(monkeypatch)
+    games = synthetic_league(2400, n_teams=16, games_per_day=8, seed=2)
+    full = run_predictions.enrich(games, "NBA")
+    lean = run_predictions.enrich(games, "NBA", lean=True)
+    assert final_ratings(lean) == final_ratings(full)
+    rows = []
+    for df in (full, lean):
+        wf = walk_forward(df, initial_days=200, retrain_every_n_days=30)
+        tf = totals_walk_forward(df, initial_days=200, retrain_every_n_days=30)
+        for c in ("home", "away"):
+            wf[c] = wf[c].astype(str); tf[c] = tf[c].astype(str)
+        rows.append(prediction_rows(wf.merge(tf, on=["date", "home", "away"], how="left"), "NBA"))
+    pd.testing.assert_frame_equal(rows[0], rows[1])
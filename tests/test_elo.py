@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bench.synthetic import synthetic_league
+from src.features.elo import Elo, EloStore, _add_elo_iterrows, add_elo, elo_snapshots, elo_sweep, final_ratings, update_elo
+
+COLS = ["elo_home_exp", "elo_home_pre", "elo_away_pre", "elo_home_post", "elo_away_post"]
+
+def _games(n=3000):
+    # 15 games a day over two seasons with a 120-day break, so regression kicks in.
+    g = synthetic_league(n, n_teams=30, seed=5)
+    g.loc[n // 2:, "date"] += pd.Timedelta(days=120)
+    return g
+
+def _latest(chunks):
+    """Last replayed version of each game (the final day of a chunk is replayed by the next)."""
+    keyed = [c.assign(n=c.groupby(["date", "home", "away"]).cumcount()) for c in chunks]
+    return pd.concat(keyed).drop_duplicates(["date", "home", "away", "n"], keep="last").reset_index(drop=True)
+
+@pytest.mark.parametrize("cuts", [[1005, 2010], [1007, 2011]])  # on and off day boundaries
+def test_update_elo_matches_full_replay(tmp_path, cuts):
+    games = _games()
+    full = add_elo(games, regress=0.3)
+    store = EloStore(tmp_path)
+    chunks = [update_elo(store, "NBA", games.iloc[:stop], regress=0.3) for stop in cuts + [len(games)]]
+    got = _latest(chunks)
+    assert len(got) == len(games)
+    for c in COLS:
+        np.testing.assert_allclose(got[c], full[c], rtol=0, atol=1e-9)
+
+def test_snapshot_resume_matches_full_replay():
+    games = _games()
+    full = add_elo(games, regress=0.3)
+    at = games["date"].iloc[1500]
+    snap = elo_snapshots(games, [at], regress=0.3)[0]
+    rest = add_elo(games, state=snap, regress=0.3)
+    expect = full[full["date"] > at]
+    assert len(rest) == len(expect)
+    for c in COLS:
+        np.testing.assert_allclose(rest[c].to_numpy(), expect[c].to_numpy(), rtol=0, atol=1e-9)
+
+def test_store_round_trip(tmp_path):
+    games = _games(600)
+    _, end = add_elo(games, return_state=True)
+    store = EloStore(tmp_path)
+    store.save("NBA", end)
+    back = store.load("NBA", end.params)
+    assert back.asof == end.asof
+    pd.testing.assert_series_equal(back.teams["rating"].sort_index(), end.teams["rating"].sort_index())
+
+@pytest.mark.parametrize("k,home_advantage", [(20, 55), (32, 0)])
+def test_add_elo_matches_iterrows_reference(k, home_advantage):
+    games = synthetic_league(1500, n_teams=20, seed=3)
+    games["home_win"] = games["home_win"].astype(float)
+    games.loc[games.index % 37 == 0, "home_win"] = np.nan  # unplayed games update as bool(nan), like Elo.update
+    got = add_elo(games, k=k, home_advantage=home_advantage)
+    ref = _add_elo_iterrows(games, k=k, home_advantage=home_advantage)
+    np.testing.assert_allclose(got["elo_home_exp"], ref["elo_home_exp"], rtol=0, atol=1e-12)
+    elo = Elo(k=k, home_advantage=home_advantage)
+    for r in games.itertuples():
+        elo.update(r.home, r.away, bool(r.home_win))
+    ratings = final_ratings(got)
+    assert ratings.keys() == elo.r.keys()
+    np.testing.assert_allclose([ratings[t] for t in elo.r], list(elo.r.values()), rtol=0, atol=1e-9)
+
+def test_elo_sweep_rows_match_add_elo():
+    games = synthetic_league(1500, n_teams=20, seed=4)
+    games["home_win"] = games["home_win"].astype(float)
+    games.loc[games.index % 41 == 0, "home_win"] = np.nan
+    grid = elo_sweep(games, k=(10, 25), home_advantage=(0, 55, 100), warmup=100)
+    assert len(grid) == 6
+    y = games["home_win"].to_numpy()
+    scored = ~np.isnan(y) & (np.arange(len(y)) >= 100)
+    for row in grid.itertuples():
+        p = np.clip(add_elo(games, k=row.k, home_advantage=row.home_advantage)["elo_home_exp"].to_numpy()[scored], 1e-15, 1 - 1e-15)
+        yb = y[scored]
+        assert row.n_games == scored.sum()
+        assert abs(row.logloss - -np.mean(yb * np.log(p) + (1 - yb) * np.log1p(-p))) < 1e-12
+        assert abs(row.brier - np.mean((p - yb) ** 2)) < 1e-12
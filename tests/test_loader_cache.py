@@ -0,0 +1,33 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from src.loaders.cache import load_seasons
+
+TODAY = date(2024, 3, 1)  # NBA 2023 in progress, 2022 closed
+
+def _fetch(seasons):
+    return pd.concat([pd.DataFrame({"date": pd.to_datetime([f"{s}-11-01", f"{s}-12-01"]), "home": "A", "away": "B",
+                                    "home_score": 100, "away_score": 90, "home_win": 1, "season": s}) for s in seasons],
+                     ignore_index=True)
+
+def _fail(seasons):
+    raise ConnectionError("offline")
+
+def test_closed_seasons_cached_open_season_refetched(tmp_path):
+    calls = []
+    fetch = lambda s: calls.append(list(s)) or _fetch(s)
+    load_seasons("nba", [2022, 2023], fetch, cache_dir=tmp_path, today=TODAY)
+    df = load_seasons("nba", [2022, 2023], fetch, cache_dir=tmp_path, today=TODAY)
+    assert calls == [[2022, 2023], [2023]]
+    assert len(df) == 4 and df["date"].is_monotonic_increasing
+
+def test_partial_season_read_when_fetch_fails(tmp_path):
+    expect = load_seasons("nba", [2022, 2023], _fetch, cache_dir=tmp_path, today=TODAY)
+    got = load_seasons("nba", [2022, 2023], _fail, cache_dir=tmp_path, today=TODAY)
+    pd.testing.assert_frame_equal(got, expect)
+
+def test_fetch_failure_without_partial_raises(tmp_path):
+    with pytest.raises(ConnectionError):
+        load_seasons("nba", [2023], _fail, cache_dir=tmp_path, today=TODAY)
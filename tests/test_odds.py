@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.edge.odds import OddsStore, read_lines, devig, implied_prob, expected_value, market_edges, closing_lines
+
+def _snapshots():
+    base = {"date": "2024-01-05", "home": "A", "away": "B", "book": "X"}
+    return pd.DataFrame([
+        {**base, "ts": "2024-01-04 10:00", "market": "moneyline", "home_price": -150, "away_price": 130},
+        {**base, "ts": "2024-01-05 10:00", "market": "h2h", "home_price": -140, "away_price": 120},
+        {**base, "ts": "2024-01-05 10:00", "market": "spreads", "line": -3.5, "home_price": -110, "away_price": -110},
+        {**base, "ts": "2024-01-05 10:00", "market": "totals", "line": 215.5, "over_price": -105, "under_price": -115},
+    ])
+
+def test_read_lines_maps_aliases_per_market(tmp_path):
+    path = tmp_path / "odds.csv"
+    _snapshots().to_csv(path, index=False)
+    df = read_lines(path)
+    assert list(df["market"]) == ["ml", "ml", "spread", "total"]
+    assert list(df["price_a"]) == [-150, -140, -110, -105]
+    assert list(df["price_b"]) == [130, 120, -110, -115]
+
+@pytest.mark.parametrize("change", [
+    lambda df: df.assign(sport="nba"),                     # unrecognised column
+    lambda df: df.assign(market="props"),                  # unknown market
+    lambda df: df.drop(columns=["book"]),                  # missing column
+    lambda df: df.drop(columns=["home_price", "over_price"]),  # nothing priced on side a
+])
+def test_read_lines_rejects_bad_files(tmp_path, change):
+    path = tmp_path / "odds.parquet"
+    change(_snapshots()).to_parquet(path, index=False)
+    with pytest.raises(ValueError):
+        read_lines(path)
+
+def test_store_and_edges(tmp_path):
+    path = tmp_path / "odds.csv"
+    _snapshots().to_csv(path, index=False)
+    store = OddsStore(tmp_path / "store")
+    assert store.ingest("NBA", [path]) == 4
+    assert store.ingest("NBA", [path]) == 4
+    lines = store.load("NBA")
+    assert len(lines) == 4
+    close = closing_lines(lines)
+    assert len(close) == 3 and close.loc[close["market"] == "ml", "price_a"].item() == -140
+
+    preds = pd.DataFrame({"date": [pd.Timestamp("2024-01-05")], "home": ["A"], "away": ["B"],
+                          "p_home": [0.6], "pred_total": [220.0]})
+    edges = market_edges(preds, lines, "NBA").set_index("market")
+    fair_a, _ = devig(implied_prob([-140]), implied_prob([120]))
+    assert edges.loc["ml", "p_fair"] == pytest.approx(fair_a[0])
+    assert edges.loc["ml", "ev_a"] == pytest.approx(expected_value(0.6, [-140])[0])
+    assert edges.loc["total", "pick"] == "OVER"
+    assert 0 < edges.loc["spread", "p_model"] < 1
+
+def test_devig_and_ev():
+    a, b = devig(implied_prob([-110]), implied_prob([-110]))
+    assert a[0] == pytest.approx(0.5) and b[0] == pytest.approx(0.5)
+    assert expected_value(0.5, [100])[0] == pytest.approx(0.0)
+    assert np.allclose(sum(devig(implied_prob([-200]), implied_prob([170]), "additive")), 1.0)
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.render_html import prediction_rows, SPREAD_COEF
+
+def _american(p):
+    p = min(max(p, 1e-6), 1 - 1e-6)
+    raw = -(p / (1 - p)) * 100.0 if p >= 0.5 else ((1 - p) / p) * 100.0
+    rounded = int(5 * round(raw / 5))
+    return 100 if rounded == 0 else rounded
+
+def _american_str(val):
+    return f"+{val}" if val > 0 else f"{val}"
+
+def _scalar_rows(preds, league):
+    """The per-row report loop prediction_rows replaced."""
+    rows = []
+    for r in preds.itertuples():
+        p_home = float(r.p_home); p_away = 1 - p_home
+        raw_spread = (p_home - 0.5) / SPREAD_COEF[league]
+        line = round(raw_spread * 2) / 2.0 if league != "MLB" else (-1.5 if p_home >= 0.5 else +1.5)
+        total = None if np.isnan(r.pred_total) else float(r.pred_total)
+        if league == "MLB":
+            spread_lean = "HOME -1.5" if p_home >= 0.5 else "AWAY +1.5"
+        else:
+            spread_lean = f"{'HOME' if line >= 0 else 'AWAY'} {abs(line):.1f}"
+        rows.append({
+            "Date": r.date.strftime("%Y-%m-%d"), "League": league, "Matchup": f"{r.away} @ {r.home}",
+            "Home Win Prob": f"{p_home:.1%}", "Away Win Prob": f"{p_away:.1%}",
+            "Home Price (American)": _american_str(_american(p_home)),
+            "Away Price (American)": _american_str(_american(p_away)),
+            "Pred. Spread (Home−Away)": f"{raw_spread:+.1f}",
+            "Model Spread Line": f"{line:+.1f}" if league != "MLB" else ("-1.5" if p_home >= 0.5 else "+1.5"),
+            "Pred. Total": f"{total:.1f}" if total is not None else "",
+            "Model Lean – ML": "HOME" if p_home >= 0.5 else "AWAY",
+            "Model Lean – Spread": spread_lean,
+            "Model Lean – O/U": "MODEL TOTAL" if total is not None else "NO EDGE",
+        })
+    return pd.DataFrame(rows)
+
+@pytest.mark.parametrize("league", ["NFL", "NBA", "MLB", "CFB"])
+def test_prediction_rows_match_scalar_loop(league):
+    rng = np.random.default_rng(0)
+    # p = 0.5, probabilities just below it (a -0.0 line), half-percent ties and random draws.
+    p = np.concatenate([[0.5, 0.4999, 0.499, 0.4975, 0.0005, 0.9995], np.arange(1, 2000) / 2000, rng.uniform(0, 1, 5000)])
+    total = np.where(rng.random(len(p)) < 0.2, np.nan, rng.uniform(5, 250, len(p)))
+    preds = pd.DataFrame({"date": pd.Timestamp("2024-01-01") + pd.to_timedelta(np.arange(len(p)) % 90, "D"),
+                          "home": "H", "away": "A", "p_home": p, "pred_total": total})
+    pd.testing.assert_frame_equal(prediction_rows(preds, league), _scalar_rows(preds, league))
+
+def test_ou_lean_against_market_total():
+    preds = pd.DataFrame({"date": pd.Timestamp("2024-01-01"), "home": "H", "away": "A", "p_home": 0.6,
+                          "pred_total": [221.0, 219.0, 220.0, 220.0, np.nan],
+                          "total_line": [220.0, 220.0, 220.0, np.nan, 220.0]})
+    assert prediction_rows(preds, "NBA")["Model Lean – O/U"].tolist() == [
+        "OVER 220.0", "UNDER 220.0", "NO EDGE", "MODEL TOTAL", "NO EDGE"]
@@ -0,0 +1,23 @@
+import pandas as pd
+
+from src.bench.synthetic import synthetic_league
+from src.features.store import FeatureStore
+
+PARAMS = {"league": "NBA", "injuries": None, "venues": None}
+
+def test_lookup_longest_prefix_and_prune(tmp_path):
+    store = FeatureStore(tmp_path)
+    games = synthetic_league(300, seed=3)
+    other = synthetic_league(300, seed=4)
+    store.save("NBA", games.iloc[:100], PARAMS, games.iloc[:100])
+    store.save("NBA", other, PARAMS, other)
+    store.save("NBA", games.iloc[:100], {**PARAMS, "lean": True}, games.iloc[:100])
+    store.save("NBA", games.iloc[:200], PARAMS, games.iloc[:200])
+
+    stored, n = store.lookup("NBA", games, PARAMS)
+    assert n == 200
+    pd.testing.assert_frame_equal(stored, games.iloc[:200].reset_index(drop=True))
+    # The 100-row prefix is superseded; unrelated games and other params are kept.
+    assert len(list((tmp_path / "nba").glob("*.json"))) == 3
+    assert store.lookup("NBA", games.iloc[:150], PARAMS) == (None, 0)
+    assert store.lookup("NBA", games, {**PARAMS, "lean": True})[1] == 100
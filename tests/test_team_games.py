@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.bench.synthetic import synthetic_league
+from src.features.team_games import add_team_rolling, extend_team_rolling, FORM_STATS, TOTALS_STATS
+
+STATS = {**FORM_STATS, **TOTALS_STATS}
+
+def _with_doubleheader(games: pd.DataFrame, at: int) -> pd.DataFrame:
+    """Insert a repeat of game `at` right after it: same date, home and away."""
+    return pd.concat([games.iloc[:at + 1], games.iloc[[at]], games.iloc[at + 1:]], ignore_index=True)
+
+@pytest.mark.parametrize("split", [400, 401, 402])
+def test_extend_matches_full_rebuild(split):
+    # The doubleheader is rows 400/401, so split=401 puts one game on each side.
+    games = _with_doubleheader(synthetic_league(800, n_teams=20, seed=1), 400)
+    full = add_team_rolling(games, STATS)
+    history = full.iloc[:split].reset_index(drop=True)
+    new = extend_team_rolling(history, games.iloc[split:].reset_index(drop=True), STATS)
+    expect = full.iloc[split:].reset_index(drop=True)
+    assert (new["game_id"].to_numpy() == expect["game_id"].to_numpy()).all()
+    for sd in ("home", "away"):
+        for name in STATS:
+            np.testing.assert_allclose(new[f"{sd}_{name}"], expect[f"{sd}_{name}"], rtol=1e-12)
+
+def test_doubleheader_games_get_distinct_ids():
+    games = _with_doubleheader(synthetic_league(50, seed=2), 10)
+    ids = add_team_rolling(games, STATS)["game_id"]
+    assert ids.is_unique
@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from src.bench.synthetic import synthetic_league
+from src.models.totals import _prep_totals, fit_totals_model, train_totals_model
+
+def test_features_built_once_match_per_window_prep():
+    # Rolling totals inputs only look back, so preparing the whole frame once and
+    # slicing a training window equals preparing that window on its own.
+    games = synthetic_league(1200, seed=7)
+    X_all, y_all = _prep_totals(games)
+    n = 700
+    X_win, y_win = _prep_totals(games.iloc[:n])
+    pd.testing.assert_frame_equal(X_all.iloc[:n], X_win)
+    pd.testing.assert_series_equal(y_all.iloc[:n], y_win)
+
+def test_cv_does_not_change_the_fitted_model():
+    games = synthetic_league(600, seed=8)
+    X, y = _prep_totals(games)
+    with_cv, mae = train_totals_model(games, cv=True)
+    without_cv, nan = fit_totals_model(X, y, cv=False)
+    assert mae > 0 and np.isnan(nan)
+    np.testing.assert_array_equal(with_cv.predict(X), without_cv.predict(X))
@@ -0,0 +1,48 @@
+import pandas as pd
+
+from src.sentiment import trends
+from src.sentiment.trends import TrendsCache, trends_by_team
+
+class FakeClient:
+    """pytrends stand-in: constant interest per term; the first `fail` calls raise."""
+    def __init__(self, volume, fail=0):
+        self.volume, self.fail, self.calls = volume, fail, []
+
+    def build_payload(self, kw, timeframe, geo):
+        self.calls.append(list(kw))
+        if len(self.calls) <= self.fail:
+            raise RuntimeError("429")
+        self.kw = kw
+
+    def interest_over_time(self):
+        return pd.DataFrame({t: [self.volume[t]] * 3 for t in self.kw} | {"isPartial": [False] * 3})
+
+VOLUME = {"A": 10.0, "B": 20.0, "C": 30.0, "D": 40.0, "E": 5.0, "X": 50.0}
+
+def test_values_scaled_to_the_anchor_in_each_batch():
+    client = FakeClient(VOLUME)
+    out = trends_by_team(list("ABCDEX"), client=client, anchor="X").set_index("team")["trends_mean"]
+    assert [c[-1] for c in client.calls] == ["X", "X"]
+    assert out.to_dict() == {"A": 20.0, "B": 40.0, "C": 60.0, "D": 80.0, "E": 10.0, "X": 100.0}
+
+def test_cache_hits_skip_the_client(tmp_path):
+    cache = TrendsCache(tmp_path / "trends.sqlite")
+    first = trends_by_team(list("ABC"), client=FakeClient(VOLUME), cache=cache, anchor="X")
+    client = FakeClient(VOLUME)
+    again = trends_by_team(list("ABC"), client=client, cache=cache, anchor="X")
+    assert client.calls == []
+    pd.testing.assert_frame_equal(first, again)
+    other = FakeClient(VOLUME)
+    trends_by_team(list("ABC"), client=other, cache=cache, anchor="D")
+    assert len(other.calls) == 1
+
+def test_failed_batches_are_retried_then_skipped(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(trends, "backoff_sleep", sleeps.append)
+    client = FakeClient(VOLUME, fail=1)
+    out = trends_by_team(list("AB"), client=client, anchor="X", retries=2)
+    assert len(client.calls) == 2 and sleeps == [0]
+    assert out["team"].tolist() == ["A", "B"]
+    client = FakeClient(VOLUME, fail=10)
+    out = trends_by_team(list("ABCDE"), client=client, anchor="X", retries=2)
+    assert len(client.calls) == 6 and out.empty
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+from lightgbm import LGBMClassifier
+
+from src.bench.synthetic import synthetic_league
+from src.features.elo import add_elo
+from src.features.team_games import add_team_rolling, FORM_STATS
+from src.models.backtest import walk_forward
+from src.models.parallel import window_cutoffs
+from src.models.totals import totals_walk_forward
+from src.models.train import FEATURES, CLF_PARAMS
+from src.models.windows import WindowData, first_window_rows
+
+STEP = pd.Timedelta(days=7)
+
+@pytest.fixture(scope="module")
+def games():
+    g = add_team_rolling(add_elo(synthetic_league(1500, seed=9)), FORM_STATS)
+    g.loc[len(g) - 5:, "home_win"] = np.nan  # unplayed games at the end
+    return g.sort_values("date").reset_index(drop=True)
+
+def test_bounds_match_date_masks(games):
+    data = WindowData(games, FEATURES, "home_win", {"objective": "binary"})
+    for cutoff in window_cutoffs(games, 30, 7):
+        n_train, end = data.bounds(cutoff, STEP)
+        assert n_train == (games["date"] <= cutoff).sum()
+        assert end - n_train == ((games["date"] > cutoff) & (games["date"] <= cutoff + STEP)).sum()
+
+def test_first_window_matches_fresh_binning(games):
+    # Bins come from the first training window, so its fit equals a fit on that window alone.
+    cutoffs = window_cutoffs(games, 30, 7)
+    data = WindowData(games, FEATURES, "home_win", {"objective": "binary", **CLF_PARAMS},
+                      bin_rows=first_window_rows(games, cutoffs))
+    n_train, end = data.bounds(cutoffs[0], STEP)
+    booster = data.fit(data.rows(0, n_train))
+    train = games.iloc[:n_train]
+    clf = LGBMClassifier(n_estimators=400, **CLF_PARAMS).fit(train.reindex(columns=FEATURES).fillna(0.0), train["home_win"])
+    test = games.iloc[n_train:end].reindex(columns=FEATURES).fillna(0.0)
+    np.testing.assert_array_equal(data.predict(booster, n_train, end), clf.predict_proba(test)[:, 1])
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_parallel_matches_serial(games, incremental):
+    kw = dict(initial_days=40, retrain_every_n_days=14, incremental=incremental, refit_every=3)
+    serial = walk_forward(games, n_jobs=1, **kw)
+    pooled = walk_forward(games, n_jobs=2, **kw)
+    assert len(serial) and serial["date"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(serial, pooled)
+
+def test_no_windows_give_empty_frames(games):
+    wf, report = walk_forward(games, initial_days=10_000, return_report=True)
+    assert wf.empty and report.empty
+    assert list(wf.columns) == ["date", "home", "away", "home_win", "p_home"]
+    tf = totals_walk_forward(games, initial_days=10_000)
+    assert tf.empty and list(tf.columns) == ["date", "home", "away", "pred_total"]